@@ -1,4 +1,5 @@
 import aws_cdk as cdk
+from lambda_forge.trackers import FunctionRegistry
 from infra.stacks.dev_stack import DevStack
 from infra.stacks.prod_stack import ProdStack
 from infra.stacks.staging_stack import StagingStack
@@ -10,3 +11,6 @@ StagingStack(app)
 ProdStack(app)
 
 app.synth()
+
+# functions.json is written once, after every stack was synthesized
+FunctionRegistry().flush()
@@ -0,0 +1,18 @@
+from botocore.exceptions import ClientError
+
+# Error codes AWS services use when a caller exceeds their request rate
+THROTTLING_ERRORS = [
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "LimitExceededException",
+    "RequestLimitExceeded",
+    "SlowDown",
+]
+
+
+def is_throttled(error):
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
@@ -0,0 +1,40 @@
+# Only the standard library is used here, forge layer --batch copies this module
+# into the project as the batch_processing layer for deployed functions
+import traceback
+
+
+def record_identifier(record):
+    if "messageId" in record:
+        return record["messageId"]
+
+    if "kinesis" in record:
+        return record["kinesis"]["sequenceNumber"]
+
+    if "dynamodb" in record:
+        return record["dynamodb"]["SequenceNumber"]
+
+    raise ValueError("Unable to find an identifier for the batch record")
+
+
+class BatchFailures:
+    def __init__(self):
+        self.failures = []
+
+    def add(self, record):
+        self.failures.append({"itemIdentifier": record_identifier(record)})
+
+    def process(self, records, handler):
+        for record in records:
+            try:
+                handler(record)
+            except Exception:
+                traceback.print_exc()
+                self.add(record)
+        return self.response()
+
+    def response(self):
+        return {"batchItemFailures": list(self.failures)}
+
+
+def process_batch(event, handler):
+    return BatchFailures().process(event.get("Records", []), handler)
@@ -10,7 +10,8 @@ class LayerBuilder(FileService):
         self.services = self.read_lines("infra/services/__init__.py")
 
     def with_layers(self):
-        f = """from aws_cdk import aws_lambda as _lambda
+        f = """from aws_cdk import AssetHashType
+from aws_cdk import aws_lambda as _lambda
 from lambda_forge.path import Path
 
 
@@ -54,14 +55,20 @@ class Layers:
         self.make_dir("layers")
         description = description if description else ""
         layers_lines = self.read_lines("infra/services/layers.py")
+        # Layers files generated before staged assets carried their own hash
+        if not any("AssetHashType" in line for line in layers_lines):
+            layers_lines.insert(0, "from aws_cdk import AssetHashType\n")
 
         layers_lines.append(f"\n")
+        layers_lines.append(f"        {name}_path = Path.layer('layers/{name}')\n")
         layers_lines.append(f"        self.{name}_layer = _lambda.LayerVersion(\n")
         layers_lines.append(f"            scope,\n")
         layers_lines.append(f"            id='{name.title().replace('_','')}Layer',\n")
-        layers_lines.append(
-            f"            code=_lambda.Code.from_asset(Path.layer('layers/{name}')),\n"
-        )
+        layers_lines.append(f"            code=_lambda.Code.from_asset(\n")
+        layers_lines.append(f"                {name}_path,\n")
+        layers_lines.append(f"                asset_hash=Path.digest({name}_path),\n")
+        layers_lines.append(f"                asset_hash_type=AssetHashType.CUSTOM,\n")
+        layers_lines.append(f"            ),\n")
         layers_lines.append(
             f"            compatible_runtimes=[_lambda.Runtime.PYTHON_3_9],\n"
         )
@@ -55,6 +55,7 @@ class ProjectBuilder(FileService):
                 "repo": {"owner": repo_owner, "name": repo_name},
                 "bucket": bucket,
                 "base_url": "",
+                "lambda": {"architecture": "x86_64", "memory_size": 128},
             },
         }
 
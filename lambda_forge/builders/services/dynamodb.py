@@ -1,3 +1,4 @@
+from aws_cdk import Duration
 from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_lambda as lambda_
 from aws_cdk import aws_lambda_event_sources as event_source
@@ -15,11 +16,49 @@ class DynamoDB:
         # )
         ...
 
-    @trigger(service="dynamodb", trigger="table", function="function")
-    def create_trigger(self, table: str, function: lambda_.Function) -> None:
+    @trigger(
+        service="dynamodb",
+        trigger="table",
+        function="function",
+        extra=[
+            "starting_position",
+            "batch_size",
+            "parallelization_factor",
+            "max_batching_window",
+            "bisect_batch_on_error",
+            "retry_attempts",
+            "filters",
+        ],
+    )
+    def create_trigger(
+        self,
+        table: str,
+        function: lambda_.Function,
+        starting_position: str = "TRIM_HORIZON",
+        batch_size: int = None,
+        parallelization_factor: int = None,
+        max_batching_window: int = None,
+        bisect_batch_on_error: bool = None,
+        retry_attempts: int = None,
+        filters: list = None,
+    ) -> None:
         table_instance = getattr(self, table)
+        options = {}
+        if max_batching_window is not None:
+            options["max_batching_window"] = Duration.seconds(max_batching_window)
+        if filters:
+            options["filters"] = [
+                lambda_.FilterCriteria.filter(pattern) for pattern in filters
+            ]
+
         dynamo_event_stream = event_source.DynamoEventSource(
-            table_instance, starting_position=lambda_.StartingPosition.TRIM_HORIZON
+            table_instance,
+            starting_position=getattr(lambda_.StartingPosition, starting_position),
+            batch_size=batch_size,
+            parallelization_factor=parallelization_factor,
+            bisect_batch_on_error=bisect_batch_on_error,
+            retry_attempts=retry_attempts,
+            **options,
         )
         function.add_event_source(dynamo_event_stream)
 
@@ -1,3 +1,4 @@
+from aws_cdk import AssetHashType
 from aws_cdk import aws_lambda as _lambda
 
 from lambda_forge import Path
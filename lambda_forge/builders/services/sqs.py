@@ -1,4 +1,4 @@
-from aws_cdk import aws_lambda_event_sources
+from aws_cdk import Duration, aws_lambda_event_sources
 from aws_cdk import aws_sqs as sqs
 
 from lambda_forge.trackers import invoke, trigger
@@ -14,10 +14,31 @@ class SQS:
         # )
         ...
 
-    @trigger(service="sqs", trigger="queue", function="function")
-    def create_trigger(self, queue, function):
+    @trigger(
+        service="sqs",
+        trigger="queue",
+        function="function",
+        extra=["batch_size", "max_batching_window", "report_batch_item_failures"],
+    )
+    def create_trigger(
+        self,
+        queue,
+        function,
+        batch_size=None,
+        max_batching_window=None,
+        report_batch_item_failures=False,
+    ):
         queue = getattr(self, queue)
-        event_source = aws_lambda_event_sources.SqsEventSource(queue)
+        event_source = aws_lambda_event_sources.SqsEventSource(
+            queue,
+            batch_size=batch_size,
+            max_batching_window=(
+                Duration.seconds(max_batching_window)
+                if max_batching_window is not None
+                else None
+            ),
+            report_batch_item_failures=report_batch_item_failures,
+        )
         function.add_event_source(event_source)
         queue.grant_consume_messages(function)
 
@@ -0,0 +1,14 @@
+import os
+
+# Kept free of heavy imports, cdk synth creates the staging directory through it
+CACHE_DIR = ".forge"
+LOGS_DIR = os.path.join(CACHE_DIR, "logs")
+
+
+def make_cache_dir(path=CACHE_DIR):
+    # .forge holds the live IoT private key and staged code, it must never be committed
+    os.makedirs(path, exist_ok=True)
+    gitignore = os.path.join(CACHE_DIR, ".gitignore")
+    if not os.path.exists(gitignore):
+        with open(gitignore, "w") as f:
+            f.write("*\n")
@@ -1,8 +1,13 @@
 import json
+import os
 from typing import NamedTuple
 
 
 def get_base_url():
+    # Lets integration tests target forge local instead of the deployed API
+    if os.environ.get("FORGE_BASE_URL"):
+        return os.environ["FORGE_BASE_URL"]
+
     with open("cdk.json") as f:
         return json.load(f)["context"]["base_url"]
 
@@ -5,7 +5,16 @@ from lambda_forge.trackers import reset
 
 class Context:
     def __init__(
-        self, stage, name, repo, region, account, bucket, resources, minimal
+        self,
+        stage,
+        name,
+        repo,
+        region,
+        account,
+        bucket,
+        resources,
+        minimal,
+        lambda_defaults=None,
     ) -> None:
         self.stage = stage
         self.name = name
@@ -15,6 +24,23 @@ class Context:
         self.bucket = bucket
         self.resources = resources
         self.minimal = minimal
+        self.lambda_defaults = lambda_defaults or {}
+
+    def lambda_settings(self, function_name, **kwargs):
+        # Project defaults < create_function arguments < stage overrides
+        stage_overrides = self.resources.get("lambda", {})
+        settings = {}
+        for layer in [
+            self.lambda_defaults,
+            self.lambda_defaults.get("functions", {}).get(function_name, {}),
+            {key: value for key, value in kwargs.items() if value is not None},
+            stage_overrides,
+            stage_overrides.get("functions", {}).get(function_name, {}),
+        ]:
+            settings.update(
+                {key: value for key, value in layer.items() if key != "functions"}
+            )
+        return settings
 
     def create_id(self, resource):
         if self.minimal:
@@ -66,6 +92,7 @@ def create_context(stage, resources, minimal):
         bucket=bucket,
         resources=resources,
         minimal=minimal,
+        lambda_defaults=cdk["context"].get("lambda", {}),
     )
 
     return context
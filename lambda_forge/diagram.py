@@ -1,4 +1,4 @@
-from diagrams import Cluster, Diagram
+from diagrams import Cluster, Diagram, Edge
 from diagrams.aws.compute import Lambda
 from diagrams.aws.database import Dynamodb
 from diagrams.aws.integration import SNS, SQS, Eventbridge
@@ -6,6 +6,28 @@ from diagrams.aws.network import APIGateway
 from diagrams.aws.storage import S3
 
 
+TRIGGER_SETTINGS = {
+    "batch_size": "batch {}",
+    "parallelization_factor": "x{} per shard",
+    "max_batching_window": "window {}s",
+    "filters": "{} filter(s)",
+    "bisect_batch_on_error": "bisect on error",
+    "report_batch_item_failures": "partial failures",
+}
+
+
+def trigger_label(trigger):
+    labels = []
+    for key, template in TRIGGER_SETTINGS.items():
+        value = trigger.get(key)
+        if not value:
+            continue
+        if key == "filters":
+            value = len(value)
+        labels.append(template.format(value))
+    return ", ".join(labels)
+
+
 def create_diagram(json_input, output_file):
     with Diagram(name="", show=False, filename=output_file, outformat="png"):
         folder_clusters = {}
@@ -71,7 +93,7 @@ def create_diagram(json_input, output_file):
                 else:
                     continue
 
-                trigger_node >> lambda_function
+                trigger_node >> Edge(label=trigger_label(trigger)) >> lambda_function
 
             for invocation in function["invocations"]:
                 service = invocation["service"]
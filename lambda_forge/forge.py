@@ -7,7 +7,7 @@ import boto3
 import click
 from InquirerPy import get_style, inquirer
 
-from lambda_forge import layers
+from lambda_forge import layers, tune
 from lambda_forge.builders.authorizer_builder import AuthorizerBuilder
 from lambda_forge.builders.docs_builder import DocsBuilder
 from lambda_forge.builders.function_builder import FunctionBuilder
@@ -16,6 +16,7 @@ from lambda_forge.builders.project_builder import ProjectBuilder
 from lambda_forge.builders.service_builder import ServiceBuilder
 from lambda_forge.diagram import create_diagram
 from lambda_forge.live import server_cli
+from lambda_forge.local import LocalServer
 from lambda_forge.logs.tail_logs import watch_logs_for_functions
 from lambda_forge.printer import Printer
 from lambda_forge.logs.launch_tui import launch_forge_logs_tui
@@ -403,7 +404,12 @@ def create_service(service):
     help="Install all custom layers locally",
     is_flag=True,
 )
-def layer(custom, external, description, requirements, install):
+@click.option(
+    "--batch",
+    help="Create the batch_processing layer with the partial batch response helpers",
+    is_flag=True,
+)
+def layer(custom, external, description, requirements, install, batch):
     """
     Creates and installs a new Lambda layer.
 
@@ -412,10 +418,10 @@ def layer(custom, external, description, requirements, install):
 
     This command facilitates layer management within the Lambda project structure.
     """
-    create_layer(custom, external, description, requirements, install)
+    create_layer(custom, external, description, requirements, install, batch)
 
 
-def create_layer(custom, external, description, requirements, install):
+def create_layer(custom, external, description, requirements, install, batch=False):
     layer_builder = LayerBuilder.a_layer().with_layers()
     print()
 
@@ -424,6 +430,15 @@ def create_layer(custom, external, description, requirements, install):
         layers.create_and_install_package(custom)
         printer.print(f"{custom.title()} layer created", "gray", 0, 1)
 
+    if batch:
+        layer_builder.with_custom_layers(
+            layers.BATCH_LAYER, "Partial batch responses for SQS and stream triggers"
+        )
+        layers.create_and_install_package(
+            layers.BATCH_LAYER, layers.batch_layer_source()
+        )
+        printer.print(f"{layers.BATCH_LAYER.title()} layer created", "gray", 0, 1)
+
     if external:
         printer.start_spinner(f"Creating Layer {external}...", "gray")
         cdk = open("cdk.json", "r").read()
@@ -453,7 +468,13 @@ AVAILABLE_TYPES = ["server", "logs", "trigger"]
 @forge.command()
 @click.option("-i", "--include", help="Include functions to watch", default=None)
 @click.option("-e", "--exclude", help="Exclude functions to watch", default=None)
-def live(include, exclude):
+@click.option(
+    "--openapi",
+    help="Apply the live API Gateway as a single OpenAPI import",
+    is_flag=True,
+    default=False,
+)
+def live(include, exclude, openapi):
     """
     Starts a live development environment for the specified Lambda function.
 
@@ -468,26 +489,7 @@ def live(include, exclude):
 
     include = include.split(",") if include else None
     exclude = exclude.split(",") if exclude else None
-    server_cli.run_live(include=include, exclude=exclude)
-
-
-@forge.command()
-@click.option("-i", "--include", help="Include functions to watch", default=None)
-@click.option("-e", "--exclude", help="Exclude functions to watch", default=None)
-def logs(include, exclude):
-    """
-    Starts a Log Stream for the specified Lambda functions.
-
-    This command shows the logs of the specified Lambda functions in real-time
-    as an alternative to the AWS CloudWatch console.
-    """
-
-    with open("live.log", "w") as f:
-        f.write("")
-
-    include = include.split(",") if include else None
-    exclude = exclude.split(",") if exclude else None
-    launch_forge_logs_tui({"include": include, "exclude": exclude})
+    server_cli.run_live(include=include, exclude=exclude, openapi=openapi)
 
 
 @forge.command()
@@ -623,7 +625,13 @@ AVAILABLE_TESTS = sorted(["unit", "integration", "coverage", "all"])
 
 @forge.command()
 @click.argument("test_type", type=click.Choice(AVAILABLE_TESTS))
-def test(test_type):
+@click.option(
+    "--local",
+    help="Run the integration tests against the local emulator",
+    is_flag=True,
+    default=False,
+)
+def test(test_type, local):
     """
     Run the tests or coverage of the project
     """
@@ -631,6 +639,19 @@ def test(test_type):
     if test_type == "unit":
         subprocess.run(["pytest", "-k", "unit", "."], check=True)
 
+    elif test_type == "integration" and local:
+        functions = json.load(open("functions.json", "r"))
+        server = LocalServer(functions, printer, port=0)
+        server.start()
+        try:
+            subprocess.run(
+                ["pytest", "-k", "integration", "."],
+                check=True,
+                env={**os.environ, "FORGE_BASE_URL": server.url},
+            )
+        finally:
+            server.stop()
+
     elif test_type == "integration":
         subprocess.run(["pytest", "-k", "integration", "."], check=True)
 
@@ -694,16 +715,43 @@ def output():
 
 
 @forge.command()
-@click.argument("stack")
+@click.argument("stack", required=False)
 @click.option(
     "--interval",
     help="Query interval for the logs",
     default=1,
 )
-def logs(stack, interval):
+@click.option("-i", "--include", help="Include functions to watch", default=None)
+@click.option("-e", "--exclude", help="Exclude functions to watch", default=None)
+@click.option("--stage", help="Stage of the deployed functions", default="Dev")
+@click.option(
+    "--spill",
+    help="Keep logs evicted from memory in .forge/logs so they stay scrollable",
+    is_flag=True,
+    default=False,
+)
+def logs(stack, interval, include, exclude, stage, spill):
     """
-    Query periodically the logs of the specified stack on AWS CloudWatch
+    Shows the logs of the deployed Lambda functions.
+
+    Without STACK, opens a Log Stream TUI with one tab per function of --stage
+    as an alternative to the AWS CloudWatch console. With STACK, queries the logs
+    of the stack periodically and writes them to logs.log.
+
+    With STACK, logs are streamed with CloudWatch Live Tail when available, one
+    session per 10 functions. Otherwise each function's log group is polled with its own
+    FilterLogEvents call, so API calls grow with the number of functions. Idle
+    functions back off to one call every 30 seconds to keep this bounded.
     """
+    include = include.split(",") if include else None
+    exclude = exclude.split(",") if exclude else None
+
+    if stack is None:
+        launch_forge_logs_tui(
+            {"include": include, "exclude": exclude, "stage": stage, "spill": spill}
+        )
+        return
+
     result = subprocess.run(["cdk", "list"], capture_output=True, text=True)
     stacks = result.stdout.splitlines()
     printer.show_banner("Logs")
@@ -715,7 +763,116 @@ def logs(stack, interval):
         exit()
 
     functions = json.load(open("functions.json", "r"))
+    if include:
+        functions = [function for function in functions if function["name"] in include]
+    if exclude:
+        functions = [
+            function for function in functions if function["name"] not in exclude
+        ]
     watch_logs_for_functions(functions=functions, log_file_path="logs.log", stack=stack, interval=interval)
 
+
+@forge.command(name="tune")
+@click.argument("function")
+@click.option("--stage", help="Stage of the deployed function", default="Dev")
+@click.option(
+    "--memory",
+    help="Comma-separated memory sizes to measure",
+    default=",".join(str(size) for size in tune.DEFAULT_MEMORY_SIZES),
+)
+@click.option("--invocations", help="Invocations per memory size", default=10)
+@click.option(
+    "--event",
+    help="JSON file with the event to replay, defaults to the last one recorded by forge live",
+    default=None,
+)
+@click.option(
+    "--strategy",
+    help="Setting to choose from the frontier",
+    type=click.Choice(tune.STRATEGIES),
+    default="balanced",
+)
+@click.option(
+    "--endpoint-url",
+    help="Lambda endpoint of a local stand-in such as LocalStack",
+    default=None,
+)
+@click.option(
+    "--dry-run",
+    help="Do not write the chosen memory size to config.py",
+    is_flag=True,
+    default=False,
+)
+def tune_memory(function, stage, memory, invocations, event, strategy, endpoint_url, dry_run):
+    """
+    Measures a deployed function across memory sizes and picks the best setting.
+
+    The function is invoked repeatedly at each memory size, billed and init durations are
+    read from the REPORT lines and the cost/latency frontier is printed. The chosen memory
+    size is written back to the function's config.py.
+    """
+    printer.show_banner("Tune")
+
+    memory_sizes = [int(size) for size in memory.split(",")]
+    tuner = tune.MemoryTuner(function, stage, printer, endpoint_url)
+
+    printer.start_spinner(f"Tuning {tuner.function_name}")
+    try:
+        results = tuner.run(memory_sizes, invocations, tuner.load_event(event))
+    except Exception as e:
+        printer.stop_spinner()
+        printer.print(str(e), "red", 1, 1)
+        exit()
+    printer.stop_spinner()
+
+    chosen = tune.choose(results, strategy)
+    printer.print(tune.format_results(results, chosen), "gray", 1)
+
+    if dry_run:
+        return
+
+    config_file = tuner.write_memory_size(chosen["memory_size"])
+    printer.print(
+        f"memory_size={chosen['memory_size']} written to {config_file}", "gray", 1, 1
+    )
+
+
+@forge.command()
+@click.option("--host", help="Host to bind the emulator to", default="127.0.0.1")
+@click.option("--port", help="Port to serve the API on", default=3000)
+@click.option("--workers", help="Maximum warm workers per function", default=4)
+@click.option("-i", "--include", help="Include functions to serve", default=None)
+@click.option("-e", "--exclude", help="Exclude functions to serve", default=None)
+def local(host, port, workers, include, exclude):
+    """
+    Serves the API Gateway functions locally without any AWS resources.
+
+    Routes are read from functions.json and every function runs in its own pool of warm
+    worker processes, reporting cold and warm latencies for each request.
+    """
+    functions = json.load(open("functions.json", "r"))
+
+    if exclude:
+        functions = [f for f in functions if f["name"] not in exclude.split(",")]
+
+    if include:
+        functions = [f for f in functions if f["name"] in include.split(",")]
+
+    server = LocalServer(functions, printer, host, port, workers)
+    printer.show_banner("Local")
+    printer.print(f"Serving {len(server.pools)} functions on {server.url}", "gray", 0, 1)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+    report = server.report()
+    if report:
+        printer.print(report, "gray", 1, 1)
+
+
 if __name__ == "__main__":
     forge()
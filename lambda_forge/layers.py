@@ -4,15 +4,24 @@ import re
 import shutil
 import subprocess
 import tempfile
-import uuid
 from pathlib import Path
 
 import boto3
 
+from lambda_forge import batch
 from lambda_forge.printer import Printer
+from lambda_forge.resolver import ResourceResolver
 
+BATCH_LAYER = "batch_processing"
 
-def create_and_install_package(package_name):
+
+def batch_layer_source():
+    # lambda_forge itself is not deployed, its batch helpers ship as a custom layer
+    with open(batch.__file__, "r") as f:
+        return f.read()
+
+
+def create_and_install_package(package_name, source=None):
     base_path = "layers"
     os.makedirs(base_path, exist_ok=True)
     base_file_path = os.path.join(base_path, "__init__.py")
@@ -36,7 +45,8 @@ def create_and_install_package(package_name):
     layer_file_path = os.path.join(package_path, f"{package_name}.py")
     with open(layer_file_path, "w") as f:
         f.write(
-            f"""def hello_from_layer():
+            source
+            or f"""def hello_from_layer():
     return "Hello from {package_name} layer!"
 """
         )
@@ -165,31 +175,19 @@ def deploy_external_layer(lib, region):
     )
 
     s3_client = boto3.client("s3", region_name=region)
+    account = boto3.client("sts", region_name=region).get_caller_identity()["Account"]
 
-    cleaned_lib = re.sub(r"[^a-zA-Z0-9]", "", lib)
+    cleaned_lib = re.sub(r"[^a-zA-Z0-9]", "", lib).lower()
 
-    bucket_name = f"{cleaned_lib}-layer-" + str(uuid.uuid4())
-
-    existing_buckets = s3_client.list_buckets()["Buckets"]
-    bucket = None
-    for existing_bucket in existing_buckets:
-        name = existing_bucket["Name"]
-        if f"{cleaned_lib}-layer-" in name:
-            bucket = existing_bucket
-            break
-
-    if not bucket:
-        bucket = s3_client.create_bucket(
-            Bucket=bucket_name, CreateBucketConfiguration={"LocationConstraint": region}
-        )
+    bucket_name = ResourceResolver().bucket(f"{cleaned_lib}-layer-{account}", region)
 
-    s3_client.upload_file(lib_zip, bucket["Name"], lib_zip.replace("_", "-"))
+    s3_client.upload_file(lib_zip, bucket_name, lib_zip.replace("_", "-"))
 
     lambda_client = boto3.client("lambda", region_name=region)
 
     response = lambda_client.publish_layer_version(
         LayerName=lib,
-        Content={"S3Bucket": bucket["Name"], "S3Key": lib_zip.replace("_", "-")},
+        Content={"S3Bucket": bucket_name, "S3Key": lib_zip.replace("_", "-")},
     )
     arn = response["LayerVersionArn"]
     os.chdir(current_dir)
@@ -1,5 +1,5 @@
 from .live import Live
-from .live_apigtw import LiveApiGtw
+from .live_apigtw import LiveApiGtw, LiveOpenApiGtw
 from .live_event import LiveEventBridge
 from .live_lambda import LiveLambda
 from .live_s3 import LiveS3
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import threading
+
+from lambda_forge.cache_dir import CACHE_DIR, make_cache_dir
+
+CACHE_FILE = os.path.join(CACHE_DIR, "live-cache.json")
+CERTIFICATES_DIR = os.path.join(CACHE_DIR, "live-certificates")
+EVENTS_DIR = os.path.join(CACHE_DIR, "events")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LiveCache:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        # Provisioning threads share one cache, it is never built twice
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance.lock = threading.RLock()
+                instance.entries = instance.__load()
+                cls._instance = instance
+        return cls._instance
+
+    def __load(self):
+        try:
+            with open(CACHE_FILE, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key, fingerprint):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry.get("fingerprint") == fingerprint:
+                return entry["value"]
+        return None
+
+    def set(self, key, fingerprint, value):
+        with self.lock:
+            self.entries[key] = {"fingerprint": fingerprint, "value": value}
+            self.__save()
+
+    def invalidate(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.__save()
+
+    def __save(self):
+        make_cache_dir()
+        temp_file = f"{CACHE_FILE}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(self.entries, f, indent=4)
+        os.replace(temp_file, CACHE_FILE)
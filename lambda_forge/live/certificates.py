@@ -1,28 +1,53 @@
 import json
 import os
-import tempfile
+import threading
 
-import boto3
 import requests
 from botocore.exceptions import ClientError
 
+from lambda_forge.live import provisioning
+from lambda_forge.live.cache import CERTIFICATES_DIR, LiveCache, make_cache_dir
+
 
 class CertificateGenerator:
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.temp_dir = tempfile.mkdtemp()
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance.temp_dir = os.path.abspath(CERTIFICATES_DIR)
+                instance.lock = threading.Lock()
+                cls._instance = instance
         return cls._instance
 
     def __init__(self, region):
-        self.iot_client = boto3.client("iot", region_name=region)
+        self.iot_client = provisioning.client("iot", region_name=region)
+        self.cache = LiveCache()
 
     def generate_certificate(self):
+        with self.lock:
+            return self.__generate_certificate()
+
+    def __generate_certificate(self):
         response = self.iot_client.describe_endpoint()
         iot_endpoint = response["endpointAddress"]
 
+        # Define file paths within the certificates directory
+        certificate_file_path = os.path.join(self.temp_dir, "certificate.pem")
+        private_key_file_path = os.path.join(self.temp_dir, "private_key.pem")
+        ca_file_path = os.path.join(self.temp_dir, "ca.pem")
+        paths = certificate_file_path, private_key_file_path, ca_file_path
+
+        # The endpoint is unique per account and region
+        certificate = self.cache.get("certificate", iot_endpoint)
+        if certificate and self.__is_reusable(certificate, paths):
+            return paths
+
+        make_cache_dir(self.temp_dir)
+        os.chmod(self.temp_dir, 0o700)
+
         # Create keys and certificate
         response = self.iot_client.create_keys_and_certificate(setAsActive=True)
         certificate_pem = response["certificatePem"]
@@ -30,24 +55,20 @@ class CertificateGenerator:
         certificate_arn = response["certificateArn"]
 
         # Get CA certificate
-        ca_pem = requests.get(
-            f"https://www.amazontrust.com/repository/AmazonRootCA1.pem?iot_endpoint={iot_endpoint}"
-        ).text
-
-        # Define file paths within the temporary directory
-        certificate_file_path = os.path.join(self.temp_dir, "certificate.pem")
-        private_key_file_path = os.path.join(self.temp_dir, "private_key.pem")
-        ca_file_path = os.path.join(self.temp_dir, "ca.pem")
-
-        # Write certificate, private key, and CA certificate to files
+        if not os.path.exists(ca_file_path):
+            ca_pem = requests.get(
+                f"https://www.amazontrust.com/repository/AmazonRootCA1.pem?iot_endpoint={iot_endpoint}"
+            ).text
+            with open(ca_file_path, "w") as ca_file:
+                ca_file.write(ca_pem)
+
+        # Write certificate and private key to files
         with open(certificate_file_path, "w") as cert_file:
             cert_file.write(certificate_pem)
 
         with open(private_key_file_path, "w") as private_key_file:
             private_key_file.write(private_key)
-
-        with open(ca_file_path, "w") as ca_file:
-            ca_file.write(ca_pem)
+        os.chmod(private_key_file_path, 0o600)
 
         # Define the policy name
         policy_name = "FullAccessPolicy"
@@ -70,4 +91,23 @@ class CertificateGenerator:
 
         self.iot_client.attach_policy(policyName=policy_name, target=certificate_arn)
 
-        return certificate_file_path, private_key_file_path, ca_file_path
+        self.cache.set(
+            "certificate",
+            iot_endpoint,
+            {"arn": certificate_arn, "id": certificate_arn.split("/")[-1]},
+        )
+
+        return paths
+
+    def __is_reusable(self, certificate, paths):
+        if not all(os.path.exists(path) for path in paths):
+            return False
+
+        try:
+            response = self.iot_client.describe_certificate(
+                certificateId=certificate["id"]
+            )
+        except ClientError:
+            return False
+
+        return response["certificateDescription"]["status"] == "ACTIVE"
@@ -1,13 +1,16 @@
 import json
 import os
+import signal
 import subprocess
-from threading import Thread
 
-import boto3
 from tabulate import tabulate
 
+from lambda_forge.live import provisioning
+from lambda_forge.live.cache import CACHE_DIR, make_cache_dir
 from lambda_forge.live.live_lambda import LiveLambda
 
+SERVER_STOP_TIMEOUT = 10
+
 
 class Live:
     def __init__(self, printer, log_file) -> None:
@@ -17,6 +20,8 @@ class Live:
         self.printer = printer
         self.log_file = log_file
         self.functions = {}
+        self.iot_endpoint = None
+        self.server = None
 
     def intro(self):
         self.printer.show_banner("Live Server")
@@ -31,44 +36,66 @@ class Live:
         if functions:
             self.print_report(functions)
 
-    def create_lambda(self, name, path, timeout):
+    def create_lambda(self, name, path, timeout, printer=None):
         iot_endpoint = self.__get_iot_endpoint()
-        self.live_lambda = LiveLambda(
-            name, self.region, timeout, iot_endpoint, self.account, self.printer
+        live_lambda = LiveLambda(
+            name,
+            self.region,
+            timeout,
+            iot_endpoint,
+            self.account,
+            printer or self.printer,
         )
-        function_arn = self.live_lambda.create_lambda()
-        self.functions[name] = {"arn": function_arn, "triggers": []}
-        self.__run_server(name, path)
+        function_arn = live_lambda.create_lambda()
+        self.functions[name] = {"arn": function_arn, "path": path, "triggers": []}
 
     def attach_trigger(self, function_name, trigger):
         self.functions[function_name]["triggers"].append(trigger)
 
     def __get_iot_endpoint(self):
-        iot_client = boto3.client("iot", region_name=self.region)
-        iot_endpoint = iot_client.describe_endpoint()["endpointAddress"]
-        iot_endpoint = iot_endpoint.replace(".iot.", "-ats.iot.")
-        return iot_endpoint
+        if self.iot_endpoint is None:
+            iot_client = provisioning.client("iot", region_name=self.region)
+            iot_endpoint = iot_client.describe_endpoint()["endpointAddress"]
+            self.iot_endpoint = iot_endpoint.replace(".iot.", "-ats.iot.")
+        return self.iot_endpoint
 
-    def __run_server(self, function_name, function_path):
+    def run_server(self):
         iot_endpoint = self.__get_iot_endpoint()
 
-        def target():
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            subprocess.Popen(
-                [
-                    "python",
-                    os.path.join(current_dir, "live_server.py"),
-                    function_name,
-                    function_path,
-                    iot_endpoint,
-                    self.log_file,
-                    self.region,
-                ]
-            )
+        # Every live function is served by the same process and MQTT connection
+        functions = [
+            {"name": name, "path": function["path"]}
+            for name, function in self.functions.items()
+        ]
+        make_cache_dir()
+        functions_file = os.path.join(CACHE_DIR, "live-functions.json")
+        with open(functions_file, "w") as f:
+            json.dump(functions, f, indent=4)
+
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.server = subprocess.Popen(
+            [
+                "python",
+                os.path.join(current_dir, "live_server.py"),
+                functions_file,
+                iot_endpoint,
+                self.log_file,
+                self.region,
+            ]
+        )
 
-        thread = Thread(target=target)
+    def stop_server(self, timeout=SERVER_STOP_TIMEOUT):
+        if self.server is None:
+            return
 
-        thread.start()
+        # live_server handles SIGTERM as a clean shutdown of MQTT and its watchers
+        self.server.send_signal(signal.SIGTERM)
+        try:
+            self.server.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.server.kill()
+            self.server.wait()
+        self.server = None
 
     def print_report(self, functions):
         def format_triggers(triggers):
@@ -1,110 +1,269 @@
-import boto3
+import json
+import threading
+
+
+from lambda_forge.live import provisioning
+from lambda_forge.live.cache import LiveCache
 
 
 class LiveApiGtw:
-    def __init__(self, account, region, printer, project, endpoint) -> None:
+    def __init__(self, account, region, printer, project) -> None:
         self.stage = "live"
         self.account = account
         self.region = region
         self.project = project
         self.printer = printer
-        self.urlpath = endpoint.strip("/").lower()
-        self.api_client = boto3.client("apigateway", region_name=self.region)
-        self.lambda_client = boto3.client("lambda", region_name=self.region)
-        self.root_id = self.__create_api()["id"]
+        self.api_client = provisioning.client("apigateway", region_name=self.region)
+        self.lambda_client = provisioning.client("lambda", region_name=self.region)
+        self.lock = threading.Lock()
+        self.root_id = None
+        self.resources = None
+        self.changed = False
 
-    def __create_api(self):
-        name = f"Live-{self.project}-REST"
-        existing_apis = self.api_client.get_rest_apis()
-
-        rest_api = None
-        for api in existing_apis["items"]:
-            if api["name"] == name:
-                rest_api = api
-                break
-
-        if not rest_api:
-            rest_api = self.api_client.create_rest_api(
-                name=name,
-                description="API Gateway for running Lambda Functions Live with AWS IoT",
+    def add_route(self, function_arn, function_name, endpoint, method):
+        urlpath = endpoint.strip("/").lower()
+
+        # Routes are added concurrently, the resource index is shared between them
+        with self.lock:
+            self.__load()
+            resource_id = self.__ensure_resource(urlpath)
+            self.__upsert_method(resource_id, method, function_arn)
+
+        provisioning.add_permission_once(
+            self.lambda_client,
+            FunctionName=function_name,
+            StatementId=provisioning.statement_id("ApiGatewayAccess", resource_id),
+            Action="lambda:InvokeFunction",
+            Principal="apigateway.amazonaws.com",
+            SourceArn=f"arn:aws:execute-api:{self.region}:{self.account}:{self.root_id}/*/*",
+        )
+
+        return f"{self._get_endpoint_url(urlpath)} ({method})"
+
+    def deploy(self):
+        with self.lock:
+            if self.root_id is None:
+                return
+            if not self.changed and not self.__pending_deployment():
+                return
+
+            self.printer.change_spinner_legend("Deploying Api Gateway")
+            self._call(
+                self.api_client.create_deployment,
+                restApiId=self.root_id,
+                stageName=self.stage,
             )
-        return rest_api
+            self.changed = False
+            LiveCache().invalidate(self.__deployment_key())
 
-    def create_trigger(self, function_arn, function_name, method):
-        all_resources = self.api_client.get_resources(restApiId=self.root_id)["items"]
-        parent_id = next(
-            (resource["id"] for resource in all_resources if resource["path"] == "/"),
-            None,
+    def __pending_deployment(self):
+        # Changes left undeployed by an earlier failed run, or a missing stage
+        if LiveCache().get(self.__deployment_key(), "pending"):
+            return True
+
+        try:
+            self._call(
+                self.api_client.get_stage, restApiId=self.root_id, stageName=self.stage
+            )
+        except self.api_client.exceptions.NotFoundException:
+            return True
+        return False
+
+    def __mark_changed(self):
+        # Remembered across runs until a deployment picks the change up
+        self.changed = True
+        LiveCache().set(self.__deployment_key(), "pending", True)
+
+    def __deployment_key(self):
+        return f"apigateway-deployment:{self.root_id}"
+
+    def __load(self):
+        if self.root_id is not None:
+            return
+
+        self.root_id = self._create_api()["id"]
+        self.resources = {}
+        paginator = self.api_client.get_paginator("get_resources")
+        for page in paginator.paginate(restApiId=self.root_id, embed=["methods"]):
+            for resource in page["items"]:
+                self.resources[resource["path"]] = {
+                    "id": resource["id"],
+                    "methods": resource.get("resourceMethods", {}),
+                }
+
+    def _create_api(self):
+        name = f"Live-{self.project}-REST"
+
+        paginator = self.api_client.get_paginator("get_rest_apis")
+        for page in paginator.paginate():
+            for api in page["items"]:
+                if api["name"] == name:
+                    return api
+
+        self.changed = True
+        return self._call(
+            self.api_client.create_rest_api,
+            name=name,
+            description="API Gateway for running Lambda Functions Live with AWS IoT",
         )
 
-        urlpaths = self.urlpath.split("/")
+    def __ensure_resource(self, urlpath):
+        parent_id = self.resources["/"]["id"]
         current_path = ""
 
-        for part in urlpaths:
+        for part in urlpath.split("/"):
             current_path += f"/{part}"
-            existing_resource = next(
-                (
-                    resource
-                    for resource in all_resources
-                    if resource["path"] == current_path
-                ),
-                None,
-            )
+            existing_resource = self.resources.get(current_path)
 
             if not existing_resource:
-                resource = self.api_client.create_resource(
-                    restApiId=self.root_id, parentId=parent_id, pathPart=part
+                resource = self._call(
+                    self.api_client.create_resource,
+                    restApiId=self.root_id,
+                    parentId=parent_id,
+                    pathPart=part,
                 )
-                parent_id = resource["id"]
-                all_resources.append({"id": resource["id"], "path": current_path})
-            else:
-                parent_id = existing_resource["id"]
+                existing_resource = {"id": resource["id"], "methods": {}}
+                self.resources[current_path] = existing_resource
+                self.__mark_changed()
 
-        try:
-            response = self.api_client.get_method(
-                restApiId=self.root_id, resourceId=parent_id, httpMethod=method
-            )
+            parent_id = existing_resource["id"]
 
-            # If the method exists, delete it
-            if response["httpMethod"] == method:
-                self.api_client.delete_method(
-                    restApiId=self.root_id, resourceId=parent_id, httpMethod=method
-                )
-        except:
-            pass
+        return parent_id
+
+    def __upsert_method(self, resource_id, method, function_arn):
+        uri = f"arn:aws:apigateway:{self.region}:lambda:path/2015-03-31/functions/{function_arn}/invocations"
+        resource = next(
+            resource
+            for resource in self.resources.values()
+            if resource["id"] == resource_id
+        )
+
+        if method in resource["methods"]:
+            integration = resource["methods"][method].get("methodIntegration", {})
+            if integration.get("uri") == uri:
+                return
+
+            self._call(
+                self.api_client.delete_method,
+                restApiId=self.root_id,
+                resourceId=resource_id,
+                httpMethod=method,
+            )
 
-        self.api_client.put_method(
+        self._call(
+            self.api_client.put_method,
             restApiId=self.root_id,
-            resourceId=parent_id,
+            resourceId=resource_id,
             httpMethod=method,
             authorizationType="NONE",
         )
 
-        self.api_client.put_integration(
+        self._call(
+            self.api_client.put_integration,
             restApiId=self.root_id,
-            resourceId=parent_id,
+            resourceId=resource_id,
             httpMethod=method,
             type="AWS_PROXY",
             integrationHttpMethod="POST",
-            uri=f"arn:aws:apigateway:{self.region}:lambda:path/2015-03-31/functions/{function_arn}/invocations",
+            uri=uri,
         )
+        resource["methods"][method] = {"methodIntegration": {"uri": uri}}
+        self.__mark_changed()
 
-        self.api_client.create_deployment(restApiId=self.root_id, stageName=self.stage)
+    def _call(self, call, **kwargs):
+        with provisioning.limit("apigateway"):
+            return provisioning.with_backoff(call, **kwargs)
 
-        try:
-            self.lambda_client.add_permission(
-                FunctionName=function_name,
-                StatementId=f"ApiGatewayAccess-{parent_id}",
-                Action="lambda:InvokeFunction",
-                Principal="apigateway.amazonaws.com",
-                SourceArn=f"arn:aws:execute-api:{self.region}:{self.account}:{self.root_id}/*/*",
+    def _get_endpoint_url(self, urlpath):
+        endpoint_url = f"https://{self.root_id}.execute-api.{self.region}.amazonaws.com/{self.stage}/{urlpath}"
+        return endpoint_url
+
+
+class LiveOpenApiGtw(LiveApiGtw):
+    def __init__(self, account, region, printer, project) -> None:
+        super().__init__(account, region, printer, project)
+        self.routes = {}
+        self.functions = set()
+
+    def add_route(self, function_arn, function_name, endpoint, method):
+        urlpath = endpoint.strip("/").lower()
+
+        # Routes are only collected here, deploy() applies them as one document
+        with self.lock:
+            if self.root_id is None:
+                self.root_id = self._create_api()["id"]
+            self.routes.setdefault(f"/{urlpath}", {})[method] = function_arn
+            self.functions.add(function_name)
+
+        return f"{self._get_endpoint_url(urlpath)} ({method})"
+
+    def deploy(self):
+        with self.lock:
+            if self.root_id is None:
+                return
+
+            self.printer.change_spinner_legend("Importing Api Gateway Definition")
+            self._call(
+                self.api_client.put_rest_api,
+                restApiId=self.root_id,
+                mode="overwrite",
+                failOnWarnings=False,
+                body=json.dumps(self.__build_document()).encode("utf-8"),
             )
-        except:
-            pass
 
-        endpoint = self.__get_endpoint_url()
-        return f"{endpoint} ({method})"
+            self.printer.change_spinner_legend("Deploying Api Gateway")
+            self._call(
+                self.api_client.create_deployment,
+                restApiId=self.root_id,
+                stageName=self.stage,
+            )
 
-    def __get_endpoint_url(self):
-        endpoint_url = f"https://{self.root_id}.execute-api.{self.region}.amazonaws.com/{self.stage}/{self.urlpath}"
-        return endpoint_url
+            for function_name in sorted(self.functions):
+                provisioning.add_permission_once(
+                    self.lambda_client,
+                    FunctionName=function_name,
+                    StatementId=provisioning.statement_id(
+                        "ApiGatewayAccess", self.root_id
+                    ),
+                    Action="lambda:InvokeFunction",
+                    Principal="apigateway.amazonaws.com",
+                    SourceArn=f"arn:aws:execute-api:{self.region}:{self.account}:{self.root_id}/*/*",
+                )
+
+    def __build_document(self):
+        paths = {}
+        for path, methods in sorted(self.routes.items()):
+            parameters = [
+                {
+                    "name": part[1:-1].rstrip("+"),
+                    "in": "path",
+                    "required": True,
+                    "schema": {"type": "string"},
+                }
+                for part in path.split("/")
+                if part.startswith("{") and part.endswith("}")
+            ]
+
+            operations = {}
+            for method, function_arn in methods.items():
+                operation = method.lower()
+                if method == "ANY":
+                    operation = "x-amazon-apigateway-any-method"
+                operations[operation] = {
+                    "responses": {},
+                    "x-amazon-apigateway-integration": {
+                        "type": "aws_proxy",
+                        "httpMethod": "POST",
+                        "uri": f"arn:aws:apigateway:{self.region}:lambda:path/2015-03-31/functions/{function_arn}/invocations",
+                    },
+                }
+                if parameters:
+                    operations[operation]["parameters"] = parameters
+
+            paths[path] = operations
+
+        return {
+            "openapi": "3.0.1",
+            "info": {"title": f"Live-{self.project}-REST", "version": "1.0"},
+            "paths": paths,
+        }
@@ -1,14 +1,14 @@
 import json
-import uuid
 
-import boto3
 import click
 
+from lambda_forge.live import provisioning
+
 
 class LiveEventBridge:
     def __init__(self, region, printer):
-        self.event_client = boto3.client("events", region_name=region)
-        self.lambda_client = boto3.client("lambda", region_name=region)
+        self.event_client = provisioning.client("events", region_name=region)
+        self.lambda_client = provisioning.client("lambda", region_name=region)
         self.printer = printer
         self.region = region
 
@@ -17,13 +17,17 @@ class LiveEventBridge:
         bus_exists = any(bus["Name"] == bus_name for bus in buses["EventBuses"])
 
         if not bus_exists:
-            self.event_client.create_event_bus(Name=bus_name)
+            try:
+                self.event_client.create_event_bus(Name=bus_name)
+            except self.event_client.exceptions.ResourceAlreadyExistsException:
+                pass
 
     def subscribe(self, function_arn, account_id, bus_name):
         rule_name = "Live-Rule"
-        self.lambda_client.add_permission(
+        provisioning.add_permission_once(
+            self.lambda_client,
             FunctionName=function_arn,
-            StatementId=str(uuid.uuid4()),
+            StatementId=provisioning.statement_id("events", bus_name, rule_name),
             Action="lambda:InvokeFunction",
             Principal="events.amazonaws.com",
             SourceArn=f"arn:aws:events:{self.region}:{account_id}:rule/{bus_name}/{rule_name}",
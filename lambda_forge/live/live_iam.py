@@ -1,13 +1,13 @@
 import json
 from datetime import datetime
 
-import boto3
+from lambda_forge.live import provisioning
 
 
 class LiveIAM:
     def __init__(self, region):
-        self.iam_client = boto3.client("iam", region_name=region)
-        self.lambda_client = boto3.client("lambda", region_name=region)
+        self.iam_client = provisioning.client("iam", region_name=region)
+        self.lambda_client = provisioning.client("lambda", region_name=region)
 
     def attach_policy_to_lambda(self, policy_dict, function_arn, policy_name):
         response = self.lambda_client.get_function(FunctionName=function_arn)
@@ -1,17 +1,32 @@
+import base64
+import hashlib
+import io
 import json
 import os
-import shutil
-import tempfile
-import time
-import uuid
+import threading
 import zipfile
 
-import boto3
+from botocore.exceptions import ClientError
 
+from lambda_forge.live import provisioning
+from lambda_forge.live.cache import LiveCache, file_digest
 from lambda_forge.live.certificates import CertificateGenerator
 
 
+def _role_not_ready(error):
+    # IAM roles take a few seconds before Lambda is able to assume them
+    return (
+        isinstance(error, ClientError)
+        and error.response["Error"]["Code"] == "InvalidParameterValueException"
+        and "role" in error.response["Error"]["Message"].lower()
+    )
+
+
 class LiveLambda:
+    _role_lock = threading.Lock()
+    _certificate_lock = threading.Lock()
+    _layer_lock = threading.Lock()
+
     def __init__(
         self, function_name, region, timeout, iot_endpoint, account, printer
     ) -> None:
@@ -20,62 +35,130 @@ class LiveLambda:
         self.timeout = timeout
         self.iot_endpoint = iot_endpoint
         self.account = account
-        self.iam_client = boto3.client("iam", region_name=self.region)
-        self.lambda_client = boto3.client("lambda", region_name=self.region)
+        self.iam_client = provisioning.client("iam", region_name=self.region)
+        self.lambda_client = provisioning.client("lambda", region_name=self.region)
         self.printer = printer
+        self.cache = LiveCache()
 
     def create_lambda(self):
-        self.__delete_lambda(self.function_name)
         role = self.__create_role()
-        zip_file_name = self.__zip_lambda()
+        code = self.__zip_lambda()
         layer_arn = self.__create_layer()
-        with open(zip_file_name, "rb") as zip_file:
-            self.printer.change_spinner_legend(f"Deploying {self.function_name}")
-            response = self.lambda_client.create_function(
+        configuration = {
+            "Description": "Lambda Function for Live Development with AWS IoT Core",
+            "Runtime": "python3.9",
+            "Role": role["Role"]["Arn"],
+            "Handler": "main.lambda_handler",
+            "Timeout": 900,
+            "Environment": {
+                "Variables": {
+                    "CLIENT_ID": self.function_name,
+                    "ENDPOINT": self.iot_endpoint,
+                    "TIMEOUT_SECONDS": str(self.timeout),
+                }
+            },
+            "Layers": [layer_arn],
+        }
+
+        current = self.__get_function()
+        if current is None:
+            return self.__create_function(code, configuration)
+
+        # Existing stubs are updated in place so their triggers stay wired
+        if current["CodeSha256"] != self.__code_sha256(code):
+            self.printer.change_spinner_legend(f"Updating {self.function_name} Code")
+            with provisioning.limit("lambda"):
+                provisioning.with_backoff(
+                    self.lambda_client.update_function_code,
+                    FunctionName=self.function_name,
+                    ZipFile=code,
+                )
+            self.__wait("function_updated")
+
+        if self.__configuration_changed(current, configuration):
+            self.printer.change_spinner_legend(
+                f"Updating {self.function_name} Configuration"
+            )
+            with provisioning.limit("lambda"):
+                provisioning.with_backoff(
+                    self.lambda_client.update_function_configuration,
+                    retry_if=_role_not_ready,
+                    FunctionName=self.function_name,
+                    **configuration,
+                )
+            self.__wait("function_updated")
+
+        return current["FunctionArn"]
+
+    def __create_function(self, code, configuration):
+        self.printer.change_spinner_legend(f"Deploying {self.function_name}")
+        with provisioning.limit("lambda"):
+            response = provisioning.with_backoff(
+                self.lambda_client.create_function,
+                retry_if=_role_not_ready,
                 FunctionName=self.function_name,
-                Description="Lambda Function for Live Development with AWS IoT Core",
-                Runtime="python3.9",
-                Role=role["Role"]["Arn"],
-                Handler="main.lambda_handler",
-                Code={"ZipFile": zip_file.read()},
+                Code={"ZipFile": code},
                 Publish=True,
-                Timeout=900,
-                Environment={
-                    "Variables": {
-                        "CLIENT_ID": self.function_name,
-                        "ENDPOINT": self.iot_endpoint,
-                        "TIMEOUT_SECONDS": str(self.timeout),
-                    }
-                },
-                Layers=[layer_arn],
+                **configuration,
             )
-            function_arn = response["FunctionArn"]
-            return function_arn
 
-    def __zip_lambda(self) -> str:
-        cert, private, ca = self.__create_certificates()
-        temp_dir = tempfile.mkdtemp()
+        self.__wait("function_active")
+        return response["FunctionArn"]
+
+    def __get_function(self):
+        try:
+            response = self.lambda_client.get_function_configuration(
+                FunctionName=self.function_name
+            )
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            return None
+        return response
+
+    def __configuration_changed(self, current, configuration):
+        current_layers = [layer["Arn"] for layer in current.get("Layers", [])]
+        current_variables = current.get("Environment", {}).get("Variables", {})
+        return (
+            current.get("Description") != configuration["Description"]
+            or current.get("Runtime") != configuration["Runtime"]
+            or current.get("Role") != configuration["Role"]
+            or current.get("Handler") != configuration["Handler"]
+            or current.get("Timeout") != configuration["Timeout"]
+            or current_variables != configuration["Environment"]["Variables"]
+            or current_layers != configuration["Layers"]
+        )
 
+    def __wait(self, waiter_name):
+        self.printer.change_spinner_legend(f"Waiting for {self.function_name}")
+        waiter = self.lambda_client.get_waiter(waiter_name)
+        waiter.wait(
+            FunctionName=self.function_name,
+            WaiterConfig={"Delay": 1, "MaxAttempts": 120},
+        )
+
+    def __code_sha256(self, code):
+        return base64.b64encode(hashlib.sha256(code).digest()).decode("utf-8")
+
+    def __zip_lambda(self) -> bytes:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         live = current_dir + "/main.py"
-        files_to_copy = [live, cert, private, ca]
+        protocol = current_dir + "/protocol.py"
 
-        for file_name in files_to_copy:
-            shutil.copy(file_name, temp_dir)
+        with self._certificate_lock:
+            cert, private, ca = self.__create_certificates()
 
-        zip_file_name = f"{self.function_name}.zip"
-        zip_file_path = os.path.join(temp_dir, zip_file_name)
-        with zipfile.ZipFile(zip_file_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(temp_dir):
-                for file in files:
-                    if ".zip" in file:
-                        continue
-                    zipf.write(
-                        os.path.join(root, file),
-                        os.path.relpath(os.path.join(root, file), temp_dir),
-                    )
+        # Fixed timestamps keep the archive, and so its CodeSha256, reproducible
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for file_name in [live, protocol, cert, private, ca]:
+                info = zipfile.ZipInfo(
+                    os.path.basename(file_name), (1980, 1, 1, 0, 0, 0)
+                )
+                info.external_attr = 0o644 << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(file_name, "rb") as f:
+                    zipf.writestr(info, f.read())
 
-        return zip_file_path
+        return buffer.getvalue()
 
     def __create_certificates(self):
         self.printer.change_spinner_legend("Creating Certificates")
@@ -96,49 +179,51 @@ class LiveLambda:
         }
 
         role_name = "Live-Lambda-Role"
-        try:
-            role = self.iam_client.get_role(RoleName=role_name)
-
-        except:
-            self.printer.change_spinner_legend("Creating Role")
-            role = self.iam_client.create_role(
-                RoleName=role_name,
-                AssumeRolePolicyDocument=json.dumps(assume_role_policy_document),
-            )
-            self.iam_client.attach_role_policy(
-                RoleName=role_name,
-                PolicyArn="arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole",
-            )
-            time.sleep(6)
+        with self._role_lock:
+            try:
+                role = self.iam_client.get_role(RoleName=role_name)
+
+            except:
+                self.printer.change_spinner_legend("Creating Role")
+                role = self.iam_client.create_role(
+                    RoleName=role_name,
+                    AssumeRolePolicyDocument=json.dumps(assume_role_policy_document),
+                )
+                self.iam_client.attach_role_policy(
+                    RoleName=role_name,
+                    PolicyArn="arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole",
+                )
+                self.iam_client.get_waiter("role_exists").wait(
+                    RoleName=role_name, WaiterConfig={"Delay": 1, "MaxAttempts": 30}
+                )
 
         return role
 
     def __create_layer(self):
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        layer_response = self.lambda_client.publish_layer_version(
-            LayerName="awsiot-layer",
-            Description="Layer containing AWS IoT dependencies",
-            Content={"ZipFile": open(current_dir + "/awsiot.zip", "rb").read()},
-            CompatibleRuntimes=["python3.9"],
-        )
-        layer_arn = layer_response["LayerVersionArn"]
-        return layer_arn
-
-    def __delete_lambda(self, stub_name):
-        function_arn = (
-            f"arn:aws:lambda:{self.region}:{self.account}:function:{stub_name}"
-        )
-        try:
-            mappings = self.lambda_client.list_event_source_mappings(
-                FunctionName=function_arn
+        layer_zip = current_dir + "/awsiot.zip"
+        fingerprint = f"{self.account}:{self.region}:{file_digest(layer_zip)}"
+
+        with self._layer_lock:
+            layer_arn = self.cache.get("layer", fingerprint)
+            if layer_arn and self.__layer_exists(layer_arn):
+                return layer_arn
+
+            self.printer.change_spinner_legend("Publishing IoT Layer")
+            layer_response = provisioning.with_backoff(
+                self.lambda_client.publish_layer_version,
+                LayerName="awsiot-layer",
+                Description="Layer containing AWS IoT dependencies",
+                Content={"ZipFile": open(layer_zip, "rb").read()},
+                CompatibleRuntimes=["python3.9"],
             )
-            for mapping in mappings["EventSourceMappings"]:
-                self.lambda_client.delete_event_source_mapping(UUID=mapping["UUID"])
-
-        except Exception as e:
-            pass
+            layer_arn = layer_response["LayerVersionArn"]
+            self.cache.set("layer", fingerprint, layer_arn)
+            return layer_arn
 
+    def __layer_exists(self, layer_arn):
         try:
-            self.lambda_client.delete_function(FunctionName=function_arn)
-        except Exception as e:
-            pass
+            self.lambda_client.get_layer_version_by_arn(Arn=layer_arn)
+            return True
+        except ClientError:
+            return False
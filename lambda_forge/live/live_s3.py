@@ -1,25 +1,20 @@
 import ast
-import uuid
 
-import boto3
 import click
 
+from lambda_forge.live import provisioning
+from lambda_forge.resolver import ResourceResolver
+
 
 class LiveS3:
     def __init__(self, region, printer):
         self.printer = printer
-        self.s3_client = boto3.client("s3", region_name=region)
-        self.lambda_client = boto3.client("lambda", region_name=region)
+        self.s3_client = provisioning.client("s3", region_name=region)
+        self.lambda_client = provisioning.client("lambda", region_name=region)
         self.region = region
 
     def create_bucket(self, bucket_name):
-        try:
-            self.s3_client.head_bucket(Bucket=bucket_name)
-        except:
-            self.s3_client.create_bucket(
-                Bucket=bucket_name,
-                CreateBucketConfiguration={"LocationConstraint": self.region},
-            )
+        return ResourceResolver().bucket(bucket_name, self.region)
 
     def subscribe(self, function_arn, account_id, bucket_name):
 
@@ -35,9 +30,10 @@ class LiveS3:
                 "LambdaFunctionArn": function_arn,
                 "Events": events,
             }
-            self.lambda_client.add_permission(
+            provisioning.add_permission_once(
+                self.lambda_client,
                 FunctionName=function_arn,
-                StatementId=str(uuid.uuid4()),
+                StatementId=provisioning.statement_id("s3", bucket_name),
                 Action="lambda:InvokeFunction",
                 Principal="s3.amazonaws.com",
                 SourceArn=f"arn:aws:s3:::{bucket_name}",
@@ -1,38 +1,215 @@
 import argparse
-import base64
+import contextvars
 import importlib
 import io
 import json
+import logging
 import os
-import pickle
+import signal
 import sys
 import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
+from lambda_forge.live import protocol
+from lambda_forge.live.cache import EVENTS_DIR, make_cache_dir
 from lambda_forge.live.certificates import CertificateGenerator
 from lambda_forge.printer import Printer
 
 printer = Printer()
 
-parser = argparse.ArgumentParser(description="Process some integers.")
-parser.add_argument("function_name", type=str)
-parser.add_argument("file_path", type=str)
+parser = argparse.ArgumentParser(description="Serve live Lambda functions.")
+parser.add_argument("functions_file", type=str)
 parser.add_argument("iot_endpoint", type=str)
 parser.add_argument("log_file", type=str)
 parser.add_argument("region", type=str)
+parser.add_argument("--workers", type=int, default=8)
 
 args = parser.parse_args()
 
-main_file_path = args.file_path + "/main.py"
+# Resolve shared code and layers imported from the project root
+sys.path.insert(0, os.getcwd())
+
+
+class HandlerModule:
+    def __init__(self, function_path):
+        self.main_file_path = os.path.join(function_path, "main.py")
+        self.roots = self.__watched_roots(function_path)
+        self.module = None
+        self.lock = threading.Lock()
+
+    def __watched_roots(self, function_path):
+        function_dir = os.path.abspath(function_path)
+        roots = [function_dir]
+
+        # Functions created with --belongs-to share code with their parent folder
+        parent = os.path.dirname(function_dir)
+        if parent != os.getcwd() and os.path.basename(parent) not in [
+            "functions",
+            "authorizers",
+        ]:
+            roots.append(parent)
+
+        layers = os.path.abspath("layers")
+        if os.path.isdir(layers):
+            roots.append(layers)
+
+        return roots
+
+    def owns(self, path):
+        path = os.path.abspath(path)
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def invalidate(self):
+        with self.lock:
+            self.module = None
+
+    def load(self):
+        with self.lock:
+            if self.module is not None:
+                return self.module, None
+
+            start_time = time.perf_counter()
+            self.__evict_modules()
+            spec = importlib.util.spec_from_file_location(
+                "lambda_handler", self.main_file_path
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.module = module
+            return module, (time.perf_counter() - start_time) * 1000
+
+    def __evict_modules(self):
+        # Drop shared code and layers imported by the handler so they are re-executed
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None)
+            if module_file and self.owns(module_file):
+                del sys.modules[name]
+
+
+class EventRecorder:
+    # The last event of each function can be replayed later by forge tune. Writes
+    # happen on a background thread so requests never wait for the disk, and
+    # events of a busy function are coalesced into one write.
+    def __init__(self):
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def record(self, function_name, event):
+        with self.condition:
+            self.pending[function_name] = event
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def __run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                pending, self.pending = self.pending, {}
+                if not pending and self.stopped:
+                    return
+
+            for function_name, event in pending.items():
+                self.__write(function_name, event)
+
+    def __write(self, function_name, event):
+        event_file = os.path.join(EVENTS_DIR, f"{function_name}.json")
+        temp_file = f"{event_file}.tmp"
+        try:
+            make_cache_dir(EVENTS_DIR)
+            with open(temp_file, "w") as f:
+                json.dump(event, f, indent=4, default=str)
+            os.replace(temp_file, event_file)
+        except OSError as e:
+            log(
+                {
+                    "function_name": function_name,
+                    "type": "error",
+                    "response": f"Could not record event: {e}",
+                }
+            )
+
+
+captured_output = contextvars.ContextVar("captured_output", default=None)
+
+
+class ContextStdout(io.TextIOBase):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = captured_output.get()
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class ContextLogHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(
+            logging.Formatter("[%(levelname)s]\t%(asctime)s\t%(name)s\t%(message)s")
+        )
+
+    def emit(self, record):
+        buffer = captured_output.get()
+        if buffer is None:
+            return
+        try:
+            buffer.write(f"{self.format(record)}\n")
+        except Exception:
+            self.handleError(record)
+
+
+class FunctionTreeHandler(FileSystemEventHandler):
+    def __init__(self, handler_modules):
+        super().__init__()
+        self.handler_modules = handler_modules
+
+    def on_any_event(self, event):
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        paths = [str(path) for path in paths if str(path).endswith(".py")]
+        for handler_module in self.handler_modules.values():
+            if any(handler_module.owns(path) for path in paths):
+                handler_module.invalidate()
+
+
+functions = json.load(open(args.functions_file, "r"))
+handler_modules = {
+    function["name"]: HandlerModule(function["path"]) for function in functions
+}
+
+# Output is attributed to the invocation running in the current context, so
+# concurrent requests never share a buffer
+sys.stdout = ContextStdout(sys.__stdout__)
+logging.getLogger().addHandler(ContextLogHandler())
+
+event_recorder = EventRecorder()
+
+# Requests above the IoT message limit arrive in chunks
+reassembler = protocol.Reassembler()
+
+# A single pool serves every function so concurrency stays bounded
+executor = ThreadPoolExecutor(max_workers=args.workers)
 
 cert_generator = CertificateGenerator(args.region)
 cert, private, ca = cert_generator.generate_certificate()
 
-topic_request = f"{args.function_name}/request"
-topic_response = f"{args.function_name}/response"
 client_id = uuid.uuid4()
 mqtt_client = AWSIoTMQTTClient(str(client_id))
 mqtt_client.configureEndpoint(args.iot_endpoint, 443)
@@ -44,119 +221,156 @@ except Exception as e:
     exit()
 
 
-def process(event, context):
+def process(function_name, event, context):
     log(event)
-    spec = importlib.util.spec_from_file_location("lambda_handler", main_file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    event_recorder.record(function_name, event)
+    try:
+        module, reload_time = handler_modules[function_name].load()
+        if reload_time is not None:
+            log(
+                {
+                    "function_name": function_name,
+                    "type": "reload",
+                    "response": f"Handler loaded in {reload_time:.2f} ms",
+                    "duration": round(reload_time, 2),
+                }
+            )
+    except Exception as e:
+        return {"statusCode": 500, "body": str(e)}, 0
+
+    start_time = time.perf_counter()
     try:
         response = module.lambda_handler(event, context)
     except Exception as e:
         response = {"statusCode": 500, "body": str(e)}
-    return response
+    return response, (time.perf_counter() - start_time) * 1000
 
 
-def message_callback(client, userdata, message):
+def handle_request(function_name, payload):
+    try:
+        message = reassembler.add(payload)
+        if message is None:
+            # Wait for the remaining chunks of the request
+            return
+        request = protocol.read_request(*message)
+    except protocol.ProtocolError as e:
+        log({"function_name": function_name, "type": "error", "response": str(e)})
+        if e.reply_to:
+            response_payload = {"statusCode": 500, "body": str(e)}
+            publish(e.reply_to, protocol.make_response(e.request_id, response_payload))
+        return
+
     try:
-        # Decode the message payload
-        decoded_bytes = base64.b64decode(message.payload)
-        deserialized_data = pickle.loads(decoded_bytes)
-
-        # Check if the message topic matches the expected request topic
-        if message.topic == topic_request:
-            # Create a StringIO object to capture the output
-            captured_output = io.StringIO()
-
-            # Redirect sys.stdout to the StringIO object
-            sys.stdout = captured_output
-
-            try:
-                # Call the process function
-                response_payload = process(
-                    deserialized_data["event"], deserialized_data["context"]
-                )
-
-            except Exception as e:
-                # Log the exception
-                log(
-                    {
-                        "function_name": args.function_name,
-                        "type": "error",
-                        "response": str(e),
-                    }
-                )
-                response_payload = {"statusCode": 500, "body": str(e)}
-            finally:
-                # Reset sys.stdout to its original value
-                sys.stdout = sys.__stdout__
-
-            # Get the captured output
-            captured_text = captured_output.getvalue()
-
-            # Publish response to MQTT
-            mqtt_client.publish(topic_response, json.dumps(response_payload), 0)
-
-            # Log the captured stdout output if any
-            if captured_text:
-                log(
-                    {
-                        "function_name": args.function_name,
-                        "type": "stdout",
-                        "response": captured_text,
-                    }
-                )
-
-            # Log the response payload
+        output = io.StringIO()
+        token = captured_output.set(output)
+        try:
+            # Call the process function
+            response_payload, duration = process(
+                function_name, request["event"], request["context"]
+            )
+
+        except Exception as e:
+            # Log the exception
+            log(
+                {
+                    "function_name": function_name,
+                    "type": "error",
+                    "response": str(e),
+                }
+            )
+            response_payload = {"statusCode": 500, "body": str(e)}
+            duration = 0
+        finally:
+            captured_output.reset(token)
+
+        # Get the captured output
+        captured_text = output.getvalue()
+
+        # Publish the response on the topic of the instance waiting for it
+        publish(
+            request["reply_to"],
+            protocol.make_response(
+                request["id"], response_payload, request["accept"]
+            ),
+        )
+
+        # Log the captured stdout output if any
+        if captured_text:
             log(
                 {
-                    "function_name": args.function_name,
-                    "type": "response",
-                    "response": response_payload,
+                    "function_name": function_name,
+                    "type": "stdout",
+                    "response": captured_text,
                 }
             )
+
+        # Log the response payload
+        log(
+            {
+                "function_name": function_name,
+                "type": "response",
+                "response": response_payload,
+                "duration": round(duration, 2),
+            }
+        )
     except Exception as e:
         # Log the exception
         log(
             {
-                "function_name": args.function_name,
+                "function_name": function_name,
                 "type": "error",
                 "response": str(e),
             }
         )
 
 
-mqtt_client.subscribe(topic_request, 1, message_callback)
+def publish(topic, frames):
+    for frame in frames:
+        mqtt_client.publish(topic, frame, 0)
 
 
-def reload_lambda_handler():
-    spec = importlib.util.spec_from_file_location("lambda_handler", main_file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    globals()["lambda_handler"] = module.lambda_handler
-
-
-def watchdog():
-    last_modified = os.path.getmtime(main_file_path)
-    while True:
-        time.sleep(1)
-        try:
-            current_modified = os.path.getmtime(main_file_path)
-            if current_modified != last_modified:
-                reload_lambda_handler()
-                last_modified = current_modified
-        except:
-            pass
-
+def message_callback(client, userdata, message):
+    function_name = message.topic.split("/")[0]
+    if function_name in handler_modules:
+        context = contextvars.copy_context()
+        executor.submit(context.run, handle_request, function_name, message.payload)
 
-def log(event):
-    with open(args.log_file, "a") as f:
-        f.write(f"{json.dumps(event)}\n")
 
+mqtt_client.subscribe(protocol.request_topic("+"), 1, message_callback)
 
-watchdog_thread = threading.Thread(target=watchdog)
-watchdog_thread.daemon = True
-watchdog_thread.start()
+log_lock = threading.Lock()
 
 
-while True:
+def log(event):
+    with log_lock:
+        with open(args.log_file, "a") as f:
+            f.write(f"{json.dumps(event)}\n")
+
+
+roots = {root for module in handler_modules.values() for root in module.roots}
+observer = Observer()
+tree_handler = FunctionTreeHandler(handler_modules)
+for root in roots:
+    if not os.path.isdir(root):
+        continue
+    if any(root.startswith(other + os.sep) for other in roots):
+        continue
+    observer.schedule(tree_handler, root, recursive=True)
+observer.start()
+
+stop_event = threading.Event()
+signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+# Block until the parent process stops the server, MQTT and file system
+# notifications are delivered on their own threads
+stop_event.wait()
+
+observer.stop()
+observer.join()
+executor.shutdown(wait=False)
+event_recorder.stop()
+try:
+    mqtt_client.disconnect()
+except Exception:
     pass
@@ -1,33 +1,25 @@
-import uuid
-
-import boto3
 import click
 
+from lambda_forge.live import provisioning
+from lambda_forge.resolver import ResourceResolver
+
 
 class LiveSNS:
     def __init__(self, region, account, printer):
-        self.sns = boto3.client("sns", region_name=region)
+        self.sns = provisioning.client("sns", region_name=region)
         self.printer = printer
         self.region = region
         self.account = account
-        self.lambda_client = boto3.client("lambda", region_name=region)
+        self.lambda_client = provisioning.client("lambda", region_name=region)
 
     def create_or_get_topic(self, topic_name):
-        existent_topics = self.sns.list_topics()
-        topics = existent_topics["Topics"]
-        for topic in topics:
-            if (
-                topic["TopicArn"]
-                == f"arn:aws:sns:{self.region}:{self.account}:{topic_name}"
-            ):
-                return topic["TopicArn"]
-
-        return self.sns.create_topic(Name=topic_name)["TopicArn"]
+        return ResourceResolver().topic_arn(topic_name, self.region, self.account)
 
     def create_trigger(self, function_arn, stub_name, topic_arn):
-        self.lambda_client.add_permission(
+        provisioning.add_permission_once(
+            self.lambda_client,
             FunctionName=stub_name,
-            StatementId=str(uuid.uuid4()),
+            StatementId=provisioning.statement_id("sns", topic_arn.split(":")[-1]),
             Action="lambda:InvokeFunction",
             Principal="sns.amazonaws.com",
             SourceArn=topic_arn,
@@ -1,16 +1,16 @@
-import boto3
 import click
 
+from lambda_forge.live import provisioning
 from lambda_forge.live.live_iam import LiveIAM
 
 
 class LiveSQS:
     def __init__(self, region, printer):
-        self.sqs = boto3.client("sqs", region_name=region)
+        self.sqs = provisioning.client("sqs", region_name=region)
         self.iam = LiveIAM(region)
-        self.iam_client = boto3.client("iam", region_name=region)
+        self.iam_client = provisioning.client("iam", region_name=region)
         self.printer = printer
-        self.lambda_client = boto3.client("lambda", region_name=region)
+        self.lambda_client = provisioning.client("lambda", region_name=region)
 
     def create_queue(self, name):
         queue_url = self.sqs.create_queue(QueueName=name)["QueueUrl"]
@@ -19,7 +19,15 @@ class LiveSQS:
         )
         return queue_url, response["Attributes"]["QueueArn"]
 
-    def subscribe(self, function_arn, queue_url, queue_arn):
+    def subscribe(
+        self,
+        function_arn,
+        queue_url,
+        queue_arn,
+        batch_size=None,
+        max_batching_window=None,
+        report_batch_item_failures=False,
+    ):
 
         policy = {
             "Version": "2012-10-17",
@@ -37,9 +45,39 @@ class LiveSQS:
             QueueUrl=queue_url, Attributes={"VisibilityTimeout": "900"}
         )
 
-        self.lambda_client.create_event_source_mapping(
-            EventSourceArn=queue_arn, FunctionName=function_arn, Enabled=True
-        )
+        settings = {
+            "BatchSize": batch_size or 10,
+            "MaximumBatchingWindowInSeconds": max_batching_window or 0,
+            "FunctionResponseTypes": (
+                ["ReportBatchItemFailures"] if report_batch_item_failures else []
+            ),
+        }
+
+        mappings = self.lambda_client.list_event_source_mappings(
+            EventSourceArn=queue_arn, FunctionName=function_arn
+        )["EventSourceMappings"]
+
+        # The stub keeps its mappings across runs now that it is updated in place
+        if not mappings:
+            self.lambda_client.create_event_source_mapping(
+                EventSourceArn=queue_arn,
+                FunctionName=function_arn,
+                Enabled=True,
+                **settings,
+            )
+
+        for mapping in mappings:
+            current = {
+                "BatchSize": mapping.get("BatchSize"),
+                "MaximumBatchingWindowInSeconds": mapping.get(
+                    "MaximumBatchingWindowInSeconds", 0
+                ),
+                "FunctionResponseTypes": mapping.get("FunctionResponseTypes", []),
+            }
+            if current != settings:
+                self.lambda_client.update_event_source_mapping(
+                    UUID=mapping["UUID"], **settings
+                )
 
         return queue_url
 
@@ -40,7 +40,7 @@ def print_service(event):
         function_name = records["function_name"]
         type_ = records["type"]
         header = create_cli_header(function_name)
-        if type_ == "stdout":
+        if type_ in ["stdout", "reload"]:
             color = "gray"
             printer.print(header, color)
             printer.print(str(records["response"]), color, 1)
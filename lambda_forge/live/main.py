@@ -1,51 +1,116 @@
-import base64
-import json
 import os
-import pickle
-import time
+import threading
+import uuid
 
 from AWSIoTPythonSDK.MQTTLib import AWSIoTMQTTClient
 
+import protocol
 
-def lambda_handler(event, context):
-    CLIENT_ID = os.environ.get("CLIENT_ID")
-    ENDPOINT = os.environ.get("ENDPOINT")
-    TIMEOUT = float(os.environ.get("TIMEOUT_SECONDS"))
-    PORT = 443
+CLIENT_ID = os.environ.get("CLIENT_ID")
+ENDPOINT = os.environ.get("ENDPOINT")
+TIMEOUT = float(os.environ.get("TIMEOUT_SECONDS", "60"))
+PORT = 443
+
+# Responses are published on a topic owned by this Lambda instance only
+INSTANCE_ID = str(uuid.uuid4())
+REPLY_TO = protocol.response_topic(CLIENT_ID, INSTANCE_ID)
+
+# The connection lives at module level so warm invocations skip the TLS handshake
+mqtt_client = None
+pending = {}
+pending_lock = threading.Lock()
+reassembler = protocol.Reassembler()
+
+# Codecs the live server advertised on its last response
+server_accept = protocol.BASELINE
+
+
+def on_response(client, userdata, message):
+    global server_accept
+    try:
+        message = reassembler.add(message.payload)
+        if message is None:
+            return
+        data = protocol.read_response(*message)
+    except Exception:
+        return
+
+    server_accept = data["accept"]
+    with pending_lock:
+        slot = pending.get(data["id"])
+
+    if slot is not None:
+        slot["response"] = data["response"]
+        slot["event"].set()
 
-    mqtt_client = AWSIoTMQTTClient(CLIENT_ID)
-    mqtt_client.configureEndpoint(ENDPOINT, PORT)
+
+def get_client():
+    global mqtt_client
+    if mqtt_client is not None:
+        return mqtt_client
+
+    # Concurrent Lambda instances must not share an MQTT client id
+    client = AWSIoTMQTTClient(f"{CLIENT_ID}-{INSTANCE_ID}")
+    client.configureEndpoint(ENDPOINT, PORT)
 
     current_dir = os.path.dirname(os.path.abspath(__file__))
     ca = current_dir + "/ca.pem"
     private_key = current_dir + "/private_key.pem"
     certificate = current_dir + "/certificate.pem"
-    mqtt_client.configureCredentials(ca, private_key, certificate)
-    mqtt_client.connect()
+    client.configureCredentials(ca, private_key, certificate)
+    client.configureAutoReconnectBackoffTime(1, 32, 20)
+    client.connect()
+    client.subscribe(REPLY_TO, 0, on_response)
+
+    mqtt_client = client
+    return mqtt_client
+
 
-    global response
-    response = None
+def publish(request_id, event, context):
+    global mqtt_client
+    frames = protocol.make_request(
+        request_id, REPLY_TO, event, context, server_accept
+    )
+    topic = protocol.request_topic(CLIENT_ID)
 
-    def callback(client, userdata, message):
-        global response
-        response = message.payload.decode()
-        try:
-            mqtt_client.disconnect()
-        except Exception as e:
-            print(f"Unexpected error during disconnect: {e}")
+    try:
+        for frame in frames:
+            get_client().publish(topic, frame, 0)
+    except Exception:
+        # The connection may not survive a long freeze, start a fresh one. The old
+        # one is closed first, AWS IoT drops whichever session connected earlier
+        # with the same client id, so both would keep kicking each other off
+        stale_client, mqtt_client = mqtt_client, None
+        if stale_client is not None:
+            try:
+                stale_client.disconnect()
+            except Exception:
+                pass
+        for frame in frames:
+            get_client().publish(topic, frame, 0)
 
-    mqtt_client.subscribe(f"{CLIENT_ID}/response", 0, callback)
 
-    payload = {"event": event, "context": context}
-    payload_bytes = pickle.dumps(payload)
-    payload_base64 = base64.b64encode(payload_bytes).decode("utf-8")
-    mqtt_client.publish(f"{CLIENT_ID}/request", payload_base64, 0)
+try:
+    get_client()
+except Exception as e:
+    print(f"Unable to connect during init: {e}")
+
+
+def lambda_handler(event, context):
+    request_id = str(uuid.uuid4())
+    slot = {"event": threading.Event(), "response": None}
+
+    with pending_lock:
+        pending[request_id] = slot
 
-    start_time = time.time()
-    while response is None and (time.time() - start_time) < TIMEOUT:
-        time.sleep(0.1)
+    try:
+        publish(request_id, event, context)
+        received = slot["event"].wait(TIMEOUT)
+    finally:
+        with pending_lock:
+            pending.pop(request_id, None)
 
-    if response is None:
+    if not received:
         return {"statusCode": 408, "body": "Request Timeout"}
 
-    return json.loads(response)
+    return slot["response"]
@@ -0,0 +1,299 @@
+import json
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+
+# This module is bundled next to main.py in the live stub, keep it free of
+# lambda_forge imports
+VERSION = 2
+
+# AWS IoT rejects messages above 128 KB, leave room for the header and topic
+CHUNK_SIZE = 120 * 1024
+COMPRESSION_THRESHOLD = 4 * 1024
+CHUNK_TTL_SECONDS = 300
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every peer understands these, anything else is used only when both sides advertise it
+BASELINE = ["json", "zlib"]
+
+# Attributes of the runtime's CognitoIdentity and ClientContext.client objects
+IDENTITY_FIELDS = ["cognito_identity_id", "cognito_identity_pool_id"]
+CLIENT_FIELDS = [
+    "installation_id",
+    "app_title",
+    "app_version_name",
+    "app_version_code",
+    "app_package_name",
+]
+
+
+class ProtocolError(Exception):
+    def __init__(self, message, request_id=None, reply_to=None):
+        super().__init__(message)
+        self.request_id = request_id
+        self.reply_to = reply_to
+
+
+class LiveContext:
+    def __init__(self, data):
+        self.function_name = data.get("function_name")
+        self.function_version = data.get("function_version")
+        self.invoked_function_arn = data.get("invoked_function_arn")
+        self.memory_limit_in_mb = data.get("memory_limit_in_mb")
+        self.aws_request_id = data.get("aws_request_id")
+        self.log_group_name = data.get("log_group_name")
+        self.log_stream_name = data.get("log_stream_name")
+        self.identity = _namespace(data.get("identity"))
+        self.client_context = None
+
+        # Rebuilt as objects so handlers keep using attribute access
+        client_context = data.get("client_context")
+        if client_context is not None:
+            self.client_context = SimpleNamespace(
+                client=_namespace(client_context.get("client")),
+                custom=client_context.get("custom"),
+                env=client_context.get("env"),
+            )
+        self.deadline = time.time() * 1000 + (data.get("remaining_time") or 0)
+
+    def get_remaining_time_in_millis(self):
+        return max(int(self.deadline - time.time() * 1000), 0)
+
+
+def _namespace(data):
+    return SimpleNamespace(**data) if data is not None else None
+
+
+def _fields(obj, names):
+    if obj is None:
+        return None
+    return {name: getattr(obj, name, None) for name in names}
+
+
+def available_codecs():
+    codecs = ["json", "zlib"]
+    if msgpack is not None:
+        codecs.append("msgpack")
+    if zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def choose_codec(accept):
+    local = available_codecs()
+    shared = [codec for codec in accept or BASELINE if codec in local]
+    serializer = "msgpack" if "msgpack" in shared else "json"
+    compression = "zstd" if "zstd" in shared else "zlib"
+    return serializer, compression
+
+
+def encode(value, accept=None):
+    serializer, compression = choose_codec(accept)
+    if serializer == "msgpack":
+        body = msgpack.packb(value, default=str, use_bin_type=True)
+    else:
+        body = json.dumps(value, default=str).encode("utf-8")
+
+    if len(body) < COMPRESSION_THRESHOLD:
+        return serializer, body
+
+    if compression == "zstd":
+        compressed = zstandard.ZstdCompressor().compress(body)
+    else:
+        compressed = zlib.compress(body)
+
+    if len(compressed) >= len(body):
+        return serializer, body
+
+    return f"{serializer}+{compression}", compressed
+
+
+def decode(codec, body, request_id=None, reply_to=None):
+    # A corrupt payload must still reach the caller as a ProtocolError that
+    # knows where to reply, otherwise the stub waits for its whole timeout
+    try:
+        return _decode(codec, body)
+    except ProtocolError as e:
+        raise ProtocolError(str(e), request_id, reply_to) from e
+    except Exception as e:
+        raise ProtocolError(
+            f"Undecodable live payload: {e}", request_id, reply_to
+        ) from e
+
+
+def _decode(codec, body):
+    serializer, _, compression = codec.partition("+")
+    if compression == "zlib":
+        body = zlib.decompress(body)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ProtocolError("zstd payload received but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression:
+        raise ProtocolError(f"Unknown compression {compression}")
+
+    if serializer == "msgpack":
+        if msgpack is None:
+            raise ProtocolError("msgpack payload received but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+
+    if serializer == "json":
+        return json.loads(body.decode("utf-8"))
+
+    raise ProtocolError(f"Unknown codec {codec}")
+
+
+def request_topic(client_id):
+    return f"{client_id}/request"
+
+
+def response_topic(client_id, instance_id):
+    return f"{client_id}/response/{instance_id}"
+
+
+def serialize_context(context):
+    if context is None:
+        return {}
+
+    get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+    client_context = getattr(context, "client_context", None)
+    if client_context is not None:
+        client_context = {
+            "client": _fields(getattr(client_context, "client", None), CLIENT_FIELDS),
+            "custom": getattr(client_context, "custom", None),
+            "env": getattr(client_context, "env", None),
+        }
+
+    return {
+        "function_name": getattr(context, "function_name", None),
+        "function_version": getattr(context, "function_version", None),
+        "invoked_function_arn": getattr(context, "invoked_function_arn", None),
+        "memory_limit_in_mb": getattr(context, "memory_limit_in_mb", None),
+        "aws_request_id": getattr(context, "aws_request_id", None),
+        "log_group_name": getattr(context, "log_group_name", None),
+        "log_stream_name": getattr(context, "log_stream_name", None),
+        "remaining_time": get_remaining_time() if get_remaining_time else None,
+        "identity": _fields(getattr(context, "identity", None), IDENTITY_FIELDS),
+        "client_context": client_context,
+    }
+
+
+def make_request(request_id, reply_to, event, context, accept=None):
+    header = {"id": request_id, "reply_to": reply_to, "accept": available_codecs()}
+    body = {"event": event, "context": serialize_context(context)}
+    return _frames(header, body, accept)
+
+
+def make_response(request_id, response, accept=None):
+    header = {"id": request_id, "accept": available_codecs()}
+    return _frames(header, {"response": response}, accept)
+
+
+def read_request(header, body):
+    try:
+        return {
+            "id": header["id"],
+            "reply_to": header["reply_to"],
+            "accept": header.get("accept") or BASELINE,
+            "event": body["event"],
+            "context": LiveContext(body.get("context") or {}),
+        }
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ProtocolError(
+            f"Malformed live request: {e}",
+            header.get("id"),
+            header.get("reply_to"),
+        ) from e
+
+
+def read_response(header, body):
+    return {
+        "id": header["id"],
+        "accept": header.get("accept") or BASELINE,
+        "response": body["response"],
+    }
+
+
+def _frames(header, value, accept):
+    codec, body = encode(value, accept)
+    chunks = [body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+    chunks = chunks or [b""]
+
+    frames = []
+    for seq, chunk in enumerate(chunks):
+        chunk_header = {
+            **header,
+            "version": VERSION,
+            "codec": codec,
+            "seq": seq,
+            "total": len(chunks),
+        }
+        frames.append(json.dumps(chunk_header).encode("utf-8") + b"\n" + chunk)
+
+    return frames
+
+
+class Reassembler:
+    def __init__(self):
+        self.partials = {}
+        self.lock = threading.Lock()
+
+    def add(self, payload):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+
+        raw_header, separator, chunk = payload.partition(b"\n")
+        try:
+            header = json.loads(raw_header.decode("utf-8"))
+        except ValueError:
+            header = None
+
+        if not separator or not isinstance(header, dict) or not header.get("id"):
+            raise ProtocolError("Malformed live message")
+
+        if header.get("version") != VERSION:
+            raise ProtocolError(
+                f"Unsupported live protocol version {header.get('version')}, expected {VERSION}",
+                header.get("id"),
+                header.get("reply_to"),
+            )
+
+        codec = header.get("codec", "")
+        request_id, reply_to = header["id"], header.get("reply_to")
+        total = header.get("total", 1)
+        if total == 1:
+            return header, decode(codec, chunk, request_id, reply_to)
+
+        with self.lock:
+            self.__expire()
+            partial = self.partials.setdefault(
+                header["id"], {"created": time.time(), "chunks": {}}
+            )
+            partial["chunks"][header.get("seq", 0)] = chunk
+            if len(partial["chunks"]) < total:
+                return None
+            del self.partials[header["id"]]
+
+        try:
+            body = b"".join(partial["chunks"][seq] for seq in range(total))
+        except KeyError as e:
+            raise ProtocolError(
+                f"Missing chunk {e} of live message", request_id, reply_to
+            ) from e
+        return header, decode(codec, body, request_id, reply_to)
+
+    def __expire(self):
+        now = time.time()
+        for message_id, partial in list(self.partials.items()):
+            if now - partial["created"] > CHUNK_TTL_SECONDS:
+                del self.partials[message_id]
@@ -0,0 +1,111 @@
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import boto3
+
+from lambda_forge.aws_errors import is_throttled
+
+# Concurrent calls allowed per AWS API while provisioning live resources
+API_LIMITS = {
+    "lambda": 8,
+    "apigateway": 2,
+    "iam": 2,
+    "iot": 2,
+    "sns": 4,
+    "sqs": 4,
+    "s3": 4,
+    "events": 4,
+}
+
+_semaphores = {
+    service: threading.BoundedSemaphore(limit) for service, limit in API_LIMITS.items()
+}
+
+_sessions = threading.local()
+
+
+def client(service, region_name=None):
+    # Creating clients from the default boto3 session is not thread-safe, every
+    # provisioning thread builds its clients from a session of its own
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = boto3.session.Session()
+    return session.client(service, region_name=region_name)
+
+
+@contextmanager
+def limit(service):
+    semaphore = _semaphores.get(service)
+    if semaphore is None:
+        yield
+        return
+
+    with semaphore:
+        yield
+
+
+def with_backoff(call, *args, retry_if=None, retries=8, base_delay=0.5, **kwargs):
+    for attempt in range(retries + 1):
+        try:
+            return call(*args, **kwargs)
+        except Exception as e:
+            retryable = is_throttled(e) or (retry_if is not None and retry_if(e))
+            if not retryable or attempt == retries:
+                raise
+            time.sleep(min(base_delay * 2**attempt, 20) * random.uniform(0.5, 1))
+
+
+def statement_id(*parts):
+    # Deterministic ids let re-runs detect permissions that are already granted
+    value = "-".join(str(part) for part in parts if part)
+    return re.sub(r"[^A-Za-z0-9_-]", "-", value)[:100]
+
+
+def add_permission_once(lambda_client, **kwargs):
+    try:
+        with limit("lambda"):
+            with_backoff(lambda_client.add_permission, **kwargs)
+    except lambda_client.exceptions.ResourceConflictException:
+        pass
+
+
+class Progress:
+    def __init__(self, printer, total):
+        self.printer = printer
+        self.total = total
+        self.done = 0
+        self.status = {}
+        self.lock = threading.Lock()
+
+    def for_function(self, name):
+        return FunctionProgress(self, name)
+
+    def update(self, name, status):
+        with self.lock:
+            self.status[name] = status
+            self.__render()
+
+    def finish(self, name):
+        with self.lock:
+            self.done += 1
+            self.status.pop(name, None)
+            self.__render()
+
+    def __render(self):
+        legend = f"Provisioning Live Functions ({self.done}/{self.total})"
+        if self.status:
+            name, status = list(self.status.items())[-1]
+            legend += f" - {name}: {status}"
+        self.printer.change_spinner_legend(legend)
+
+
+class FunctionProgress:
+    def __init__(self, progress, name):
+        self.progress = progress
+        self.name = name
+
+    def change_spinner_legend(self, legend):
+        self.progress.update(self.name, legend)
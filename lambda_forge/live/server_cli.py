@@ -1,22 +1,18 @@
 import json
 import os
 import subprocess
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from InquirerPy import get_style, inquirer
 from lambda_forge.live.tui import launch_forge_tui
 
 from lambda_forge.printer import Printer
 from lambda_forge.live.tui.api.forge import ForgeAPI
-from . import Live, LiveApiGtw, LiveEventBridge, LiveS3, LiveSNS, LiveSQS
+from . import Live, LiveApiGtw, LiveEventBridge, LiveOpenApiGtw, LiveS3, LiveSNS, LiveSQS, provisioning
 
 printer = Printer()
 
-
-def create_api_gateway_trigger(account, region, project, function_arn, selected_function, endpoint, method):
-    live_apigtw = LiveApiGtw(account, region, printer, project, endpoint)
-    trigger = live_apigtw.create_trigger(function_arn, selected_function, method)
-    return trigger
+MAX_PARALLEL_FUNCTIONS = 8
 
 
 def create_sns_trigger(account, region, function_arn, selected_function, topic_name):
@@ -26,12 +22,19 @@ def create_sns_trigger(account, region, function_arn, selected_function, topic_n
     return trigger
 
 
-def create_sqs_trigger(region, function_arn, queue_name):
+def create_sqs_trigger(region, function_arn, queue_name, function_trigger):
     live_sqs = LiveSQS(region, printer)
-    printer.show_banner("Live Server")
-    printer.start_spinner(f"Creating {queue_name} Queue")
     queue_url, queue_arn = live_sqs.create_queue(queue_name)
-    trigger = live_sqs.subscribe(function_arn, queue_url, queue_arn)
+    trigger = live_sqs.subscribe(
+        function_arn,
+        queue_url,
+        queue_arn,
+        batch_size=function_trigger.get("batch_size"),
+        max_batching_window=function_trigger.get("max_batching_window"),
+        report_batch_item_failures=function_trigger.get(
+            "report_batch_item_failures", False
+        ),
+    )
     return trigger
 
 
@@ -49,7 +52,7 @@ def create_event_bridge_trigger(region, account, function_arn, bus_name):
     return trigger
 
 
-def run_live(include=None, exclude=None):
+def run_live(include=None, exclude=None, openapi=False):
     printer.show_banner("Live Development")
 
     data = json.load(open("cdk.json", "r"))
@@ -90,88 +93,138 @@ def run_live(include=None, exclude=None):
 
     live = Live(printer, "live.log")
 
+    printer.start_spinner("Provisioning Live Functions")
+    progress = provisioning.Progress(printer, len(functions))
+    api_class = LiveOpenApiGtw if openapi else LiveApiGtw
+    live_apigtw = api_class(account, region, printer, project)
     server_functions = []
-    for function in functions:
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_FUNCTIONS) as executor:
+        futures = {
+            executor.submit(
+                provision_function,
+                live,
+                live_apigtw,
+                function,
+                project,
+                region,
+                account,
+                progress,
+            ): function
+            for function in functions
+        }
+        for future in as_completed(futures):
+            try:
+                server_functions.extend(future.result())
+            except Exception as e:
+                errors.append(f"{futures[future]['name']}: {e}")
+
+    # All routes share one stage deployment instead of one per endpoint
+    if not errors:
         try:
-            function_name = f"Live-{project}-{function['name']}"
-            printer.start_spinner(f"Creating Lambda Function {function_name}")
-            live.create_lambda(function_name, function["path"], function["timeout"])
-            time.sleep(4)
-            for function_trigger in function["triggers"]:
-
-                function_arn = f"arn:aws:lambda:{region}:{account}:function:{function_name}"
-
-                if function_trigger["service"] == "api_gateway":
-                    
-                    trigger = create_api_gateway_trigger(
-                        account,
-                        region,
-                        project,
-                        function_arn,
-                        function_name,
-                        function_trigger["trigger"],
-                        function_trigger["method"],
-                    )
-                    server_function = {
-                        "service": "Api Gateway",
-                        "name": function_name,
-                        "type": "URL",
-                        "trigger": trigger
-                    }
-                    server_functions.append(server_function)
-
-                if function_trigger["service"] == "sns":
-                    topic = f"Live-{project}-{function_trigger['trigger']}"
-                    trigger = create_sns_trigger(account, region, function_arn, function_name, topic)
-                    server_function = {
-                        "service": "SNS",
-                        "name": function_name,
-                        "type": "Topic ARN",
-                        "trigger": trigger
-                    }
-                    server_functions.append(server_function)
-
-                if function_trigger["service"] == "sqs":
-                    queue = f"Live-{project}-{function_trigger['trigger']}"
-                    trigger = create_sqs_trigger(region, function_arn, queue)
-                    server_function = {
-                        "service": "SQS",
-                        "name": function_name,
-                        "type": "Queue URL",
-                        "trigger": trigger
-                    }
-                    server_functions.append(server_function)
-
-                if function_trigger["service"] == "s3":
-                    bucket = f"live-{project.lower()}-{function_trigger['trigger'].replace('_', '-').replace(' ', '-').lower()}"
-                    trigger = create_s3_trigger(region, account, function_arn, bucket)
-                    server_function = {
-                        "service": "S3",
-                        "name": function_name,
-                        "type": "Bucket Name",
-                        "trigger": trigger
-                    }
-                    server_functions.append(server_function)
-
-                if function_trigger["service"] == "event_bridge":
-                    bus = f"Live-{project}-{function_trigger['trigger']}"
-                    trigger = create_event_bridge_trigger(region, account, function_arn, bus)
-                    server_function = {
-                        "service": "Event Bridge",
-                        "name": function_name,
-                        "type": "Bus Name",
-                        "trigger": trigger
-                    }
-                    server_functions.append(server_function)
-
-                live.attach_trigger(function_name, trigger)
+            live_apigtw.deploy()
+        except Exception as e:
+            errors.append(f"Api Gateway: {e}")
 
-            printer.stop_spinner()
+    printer.stop_spinner()
 
-        except Exception as e:
-            printer.print(str(e), "red", 1, 1)
-            printer.stop_spinner()
-            exit()
-    
+    if errors:
+        printer.print("\n".join(errors), "red", 1, 1)
+        exit()
+
+    live.run_server()
     ForgeAPI().set_functions(server_functions)
-    launch_forge_tui()
+    try:
+        launch_forge_tui()
+    finally:
+        # A leftover server would keep answering requests next to the next run's
+        live.stop_server()
+
+
+def provision_function(live, live_apigtw, function, project, region, account, progress):
+    function_name = f"Live-{project}-{function['name']}"
+    function_progress = progress.for_function(function_name)
+    function_progress.change_spinner_legend("Creating Lambda Function")
+    live.create_lambda(
+        function_name, function["path"], function["timeout"], function_progress
+    )
+
+    server_functions = []
+    function_arn = f"arn:aws:lambda:{region}:{account}:function:{function_name}"
+    for function_trigger in function["triggers"]:
+        service = function_trigger["service"]
+        function_progress.change_spinner_legend(f"Creating {service} Trigger")
+
+        if service == "api_gateway":
+            trigger = live_apigtw.add_route(
+                function_arn,
+                function_name,
+                function_trigger["trigger"],
+                function_trigger["method"],
+            )
+            server_function = {
+                "service": "Api Gateway",
+                "name": function_name,
+                "type": "URL",
+                "trigger": trigger,
+            }
+
+        elif service == "sns":
+            topic = f"Live-{project}-{function_trigger['trigger']}"
+            with provisioning.limit("sns"):
+                trigger = create_sns_trigger(
+                    account, region, function_arn, function_name, topic
+                )
+            server_function = {
+                "service": "SNS",
+                "name": function_name,
+                "type": "Topic ARN",
+                "trigger": trigger,
+            }
+
+        elif service == "sqs":
+            queue = f"Live-{project}-{function_trigger['trigger']}"
+            with provisioning.limit("sqs"):
+                trigger = create_sqs_trigger(
+                    region, function_arn, queue, function_trigger
+                )
+            server_function = {
+                "service": "SQS",
+                "name": function_name,
+                "type": "Queue URL",
+                "trigger": trigger,
+            }
+
+        elif service == "s3":
+            bucket = f"live-{project.lower()}-{function_trigger['trigger'].replace('_', '-').replace(' ', '-').lower()}"
+            with provisioning.limit("s3"):
+                trigger = create_s3_trigger(region, account, function_arn, bucket)
+            server_function = {
+                "service": "S3",
+                "name": function_name,
+                "type": "Bucket Name",
+                "trigger": trigger,
+            }
+
+        elif service == "event_bridge":
+            bus = f"Live-{project}-{function_trigger['trigger']}"
+            with provisioning.limit("events"):
+                trigger = create_event_bridge_trigger(
+                    region, account, function_arn, bus
+                )
+            server_function = {
+                "service": "Event Bridge",
+                "name": function_name,
+                "type": "Bus Name",
+                "trigger": trigger,
+            }
+
+        else:
+            continue
+
+        server_functions.append(server_function)
+        live.attach_trigger(function_name, trigger)
+
+    progress.finish(function_name)
+    return server_functions
@@ -1,25 +1,76 @@
 import os
 from pathlib import Path
+from typing import Callable, List, Tuple
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+
+class FileChangeHandler(FileSystemEventHandler):
+    def __init__(self, file_to_watch: str, callback: Callable[[], None]):
+        super().__init__()
+        self.file_to_watch = file_to_watch
+        self.callback = callback
+
+    def on_any_event(self, event):
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        if self.file_to_watch in [os.path.abspath(path) for path in paths if path]:
+            self.callback()
 
 
 class FileWatcher:
     def __init__(self, file_to_watch: Path):
         self.file_to_watch = file_to_watch
-        self.last_modified_time = 0
+        self.offset = 0
+        self.inode = None
+        self.partial = b""
+        self.observer = None
 
-    def get_modified_time(self):
+    def read_new_lines(self) -> Tuple[List[str], bool]:
+        # Returns the lines appended since the last read and whether the file
+        # was truncated or replaced, in which case it is read from the start
         try:
-            return os.path.getmtime(self.file_to_watch)
+            stat = os.stat(self.file_to_watch)
         except FileNotFoundError:
-            return None
+            return [], False
+
+        reset = stat.st_ino != self.inode or stat.st_size < self.offset
+        if reset:
+            reset = self.inode is not None
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.partial = b""
+
+        if stat.st_size == self.offset:
+            return [], reset
+
+        with open(self.file_to_watch, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        # A line still being written is kept until its newline arrives
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        lines = [line.decode("utf-8", errors="replace").strip() for line in lines]
+        return lines, reset
+
+    def start(self, callback: Callable[[], None]):
+        path = os.path.abspath(self.file_to_watch)
+        self.observer = Observer()
+        self.observer.schedule(
+            FileChangeHandler(path, callback), os.path.dirname(path), recursive=False
+        )
+        self.observer.daemon = True
+        self.observer.start()
 
-    def has_modified(self):
-        current_modified_time = self.get_modified_time()
-        if current_modified_time != self.last_modified_time:
-            self.last_modified_time = current_modified_time
-            return True
-        return False
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer = None
 
     def clear_file(self):
         with open(self.file_to_watch, "w") as f:
             f.write("")
+        self.offset = 0
+        self.partial = b""
@@ -1,89 +1,21 @@
-from collections.abc import Callable
 import json
-from typing import Optional
 from rich import box
+from rich.console import RenderableType
 from rich.panel import Panel
 from pathlib import Path
-from rich.text import Text, TextType
-from rich.style import Style
-from textual.app import ComposeResult, on
+from rich.text import Text
+from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.widget import Widget
-from textual.widgets import OptionList
-from textual.widgets.option_list import Option
 
 from lambda_forge.live.tui.api.file_watcher import FileWatcher
+from lambda_forge.logs.buffer import RingBuffer
+from lambda_forge.logs.tui.ui.widgets.log_view import LogView
 
-LOG_CHECK_INTERVAL = 2
+LOG_BUFFER_SIZE = 5000
 
-
-class SingleLog(Option):
-
-    tall = False
-
-    def __init__(
-        self,
-        prompt: str,
-        get_rich_style: Callable[[str], Style],
-        id: Optional[str] = None,
-        disabled: bool = False,
-    ) -> None:
-        super().__init__(prompt, id, disabled)
-        self.default_prompt = prompt
-        self.get_rich_style = get_rich_style
-        self.refresh_prompt()
-
-    def refresh_prompt(self):
-        try:
-            json_string = self.default_prompt
-            data = json.loads(json_string)
-            if not self.tall:
-                method = data["httpMethod"]
-                resource = data["resource"]
-                path = data["path"]
-
-                method = Text(method, style="b #a3be8c")
-                method.pad(1)
-
-                resource = (
-                    Text() + Text(" resource:", style="dim #d8dee9") + Text(resource)
-                )
-                resource.pad(1)
-
-                path = Text() + Text(" path:", style="dim #d8dee9") + Text(path)
-                path.pad(1)
-
-                text = Text() + method + resource + path
-
-            else:
-                formatted_json_string = json.dumps(data, indent=4)
-                text = Text(formatted_json_string)
-
-            self._set_prompt(text)
-
-        except:
-            data = self.default_prompt
-            if not self.tall:
-                self._set_prompt(data[:10])
-            else:
-                self._set_prompt(data)
-
-    def _set_prompt(self, prompt: TextType):
-
-        if isinstance(prompt, str):
-            prompt = Text(prompt)
-
-        self.set_prompt(
-            Panel(
-                prompt,
-                box=box.ROUNDED,
-                border_style=self.get_rich_style("option-item-border"),
-            )
-        )
-
-    def toggle_display(self):
-        self.tall = not self.tall
-        self.refresh_prompt()
+# A collapsed log is a single line wrapped in a panel
+COLLAPSED_HEIGHT = 3
 
 
 class LogStream(Widget):
@@ -102,53 +34,72 @@ class LogStream(Widget):
         super().__init__()
         self.log_path = log_path
         self.watcher = FileWatcher(log_path)
-        self.set_interval(LOG_CHECK_INTERVAL, self.check_file)
+        self.logs = RingBuffer(LOG_BUFFER_SIZE)
 
     def compose(self) -> ComposeResult:
-        yield OptionList()
+        yield LogView(self.logs, self.render_log, COLLAPSED_HEIGHT)
 
     def on_show(self):
-        self.query_one(OptionList).focus()
-
-    def check_file(self):
-        if self.watcher.has_modified():
-            self.update_logs()
+        self.log_view.focus()
 
     def update_logs(self):
-        self.log_list.clear_options()
-        with open(self.log_path, "r") as f:
-            for line in f.readlines():
-                self.log_list.add_option(
-                    SingleLog(
-                        line.strip(),
-                        self.get_component_rich_style,
-                    )
+        # Only the lines appended since the last read are loaded
+        lines, reset = self.watcher.read_new_lines()
+        if reset:
+            self.log_view.clear()
+        if lines:
+            self.logs.extend(lines)
+            self.log_view.refresh_entries()
+
+    def on_file_changed(self):
+        self.app.call_from_thread(self.update_logs)
+
+    def render_log(self, line: str, tall: bool) -> RenderableType:
+        try:
+            data = json.loads(line)
+            if not tall:
+                method = Text(data["httpMethod"], style="b #a3be8c")
+                method.pad(1)
+
+                resource = (
+                    Text()
+                    + Text(" resource:", style="dim #d8dee9")
+                    + Text(data["resource"])
                 )
+                resource.pad(1)
 
-    @property
-    def log_list(self) -> OptionList:
-        return self.query_one(OptionList)
+                path = Text() + Text(" path:", style="dim #d8dee9") + Text(data["path"])
+                path.pad(1)
 
-    async def on_mount(self):
-        self.update_logs()
+                text = Text() + method + resource + path
+
+            else:
+                text = Text(json.dumps(data, indent=4))
 
-    @on(OptionList.OptionSelected)
-    def toggle_display(self, event: OptionList.OptionSelected):
-        if not isinstance(event.option, SingleLog):
-            return
+        except:
+            text = Text(line if tall else line[:10])
 
-        for option in self.log_list._options:
-            if not isinstance(option, SingleLog):
-                continue
+        if not tall:
+            text.no_wrap = True
+            text.overflow = "ellipsis"
 
-            if option == event.option:
-                option.toggle_display()
-            else:
-                option.tall = False
-            option.refresh_prompt()
+        return Panel(
+            text,
+            box=box.ROUNDED,
+            border_style=self.get_component_rich_style("option-item-border"),
+        )
+
+    @property
+    def log_view(self) -> LogView:
+        return self.query_one(LogView)
+
+    async def on_mount(self):
+        self.update_logs()
+        self.watcher.start(self.on_file_changed)
 
-        self.log_list._refresh_lines()
+    def on_unmount(self):
+        self.watcher.stop()
 
     def action_clear_logs(self):
-        self.log_list.clear_options()
+        self.log_view.clear()
         self.watcher.clear_file()
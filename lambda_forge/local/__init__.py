@@ -0,0 +1,3 @@
+from .router import Router
+from .server import LocalServer
+from .workers import WorkerPool
@@ -0,0 +1,42 @@
+import re
+
+
+class Router:
+    def __init__(self) -> None:
+        self.routes = []
+
+    def add(self, method, endpoint, function_name):
+        resource = "/" + endpoint.strip("/")
+        pattern = ""
+        static_parts = 0
+        for part in resource.strip("/").split("/"):
+            if not part:
+                continue
+            if part.startswith("{") and part.endswith("+}"):
+                pattern += f"/(?P<{part[1:-2]}>.+)"
+            elif part.startswith("{") and part.endswith("}"):
+                pattern += f"/(?P<{part[1:-1]}>[^/]+)"
+            else:
+                pattern += "/" + re.escape(part)
+                static_parts += 1
+
+        self.routes.append(
+            {
+                "method": method.upper(),
+                "resource": resource,
+                "pattern": re.compile(pattern or "/"),
+                "function": function_name,
+                "static_parts": static_parts,
+            }
+        )
+
+        # Literal segments win over path parameters, like API Gateway does
+        self.routes.sort(key=lambda route: -route["static_parts"])
+
+    def match(self, method, path):
+        path = "/" + path.strip("/")
+        for route in self.routes:
+            match = route["pattern"].fullmatch(path)
+            if match and route["method"] in [method.upper(), "ANY"]:
+                return route, match.groupdict()
+        return None, None
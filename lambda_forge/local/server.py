@@ -0,0 +1,206 @@
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from tabulate import tabulate
+
+from lambda_forge.local.router import Router
+from lambda_forge.local.workers import WorkerPool
+
+HTTP_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class LocalServer:
+    def __init__(self, functions, printer, host="127.0.0.1", port=3000, workers=4):
+        self.printer = printer
+        self.router = Router()
+        self.pools = {}
+
+        for function in functions:
+            for trigger in function["triggers"]:
+                if trigger["service"] != "api_gateway":
+                    continue
+                self.router.add(trigger["method"], trigger["trigger"], function["name"])
+                if function["name"] not in self.pools:
+                    self.pools[function["name"]] = WorkerPool(function, workers)
+
+        self.httpd = ThreadingHTTPServer((host, port), self.__request_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for pool in self.pools.values():
+            pool.stop()
+
+    def handle(self, method, raw_path, headers, body):
+        url = urlsplit(raw_path)
+        route, path_parameters = self.router.match(method, url.path)
+        if route is None:
+            return 404, JSON_HEADERS, b'{"message":"Not Found"}'
+
+        request_id = str(uuid.uuid4())
+        event = self.__create_event(
+            method, url, route, path_parameters, headers, body, request_id
+        )
+
+        try:
+            result = self.pools[route["function"]].invoke(request_id, event)
+        except Exception as e:
+            self.printer.print(f"{method} {url.path} {route['function']}: {e}", "red")
+            return 502, JSON_HEADERS, b'{"message":"Internal server error"}'
+
+        if result["error"]:
+            self.printer.print(result["error"], "red")
+            return 502, JSON_HEADERS, b'{"message":"Internal server error"}'
+
+        status, response_headers, response_body = self.__read_response(
+            result["response"]
+        )
+        start = "cold" if result["cold"] else "warm"
+        self.printer.print(
+            f"{method} {url.path} -> {route['function']} {status} "
+            f"{start} {result['latency']:.2f} ms (handler {result['duration']:.2f} ms)",
+            "gray",
+        )
+        return status, response_headers, response_body
+
+    def report(self):
+        rows = []
+        for name, pool in sorted(self.pools.items()):
+            for start, latencies in pool.latencies.items():
+                if not latencies:
+                    continue
+                latencies = sorted(latencies)
+                p90 = latencies[min(int(len(latencies) * 0.9), len(latencies) - 1)]
+                rows.append(
+                    [
+                        name,
+                        start,
+                        len(latencies),
+                        f"{latencies[len(latencies) // 2]:.2f} ms",
+                        f"{p90:.2f} ms",
+                        f"{latencies[-1]:.2f} ms",
+                    ]
+                )
+
+        if not rows:
+            return ""
+
+        return tabulate(
+            rows,
+            headers=["Function", "Start", "Invocations", "p50", "p90", "Max"],
+            tablefmt="rounded_grid",
+        )
+
+    def __create_event(
+        self, method, url, route, path_parameters, headers, body, request_id
+    ):
+        query = parse_qs(url.query, keep_blank_values=True)
+        multi_value_headers = {}
+        for key, value in headers:
+            multi_value_headers.setdefault(key, []).append(value)
+
+        is_base64_encoded = False
+        if body:
+            try:
+                body = body.decode("utf-8")
+            except UnicodeDecodeError:
+                body = base64.b64encode(body).decode("utf-8")
+                is_base64_encoded = True
+
+        return {
+            "resource": route["resource"],
+            "path": url.path,
+            "httpMethod": method,
+            "headers": {key: values[-1] for key, values in multi_value_headers.items()},
+            "multiValueHeaders": multi_value_headers,
+            "queryStringParameters": (
+                {key: values[-1] for key, values in query.items()} if query else None
+            ),
+            "multiValueQueryStringParameters": query or None,
+            "pathParameters": path_parameters or None,
+            "stageVariables": None,
+            "requestContext": {
+                "resourcePath": route["resource"],
+                "httpMethod": method,
+                "path": url.path,
+                "stage": "local",
+                "requestId": request_id,
+                "requestTimeEpoch": int(time.time() * 1000),
+                "identity": {"sourceIp": "127.0.0.1"},
+            },
+            "body": body or None,
+            "isBase64Encoded": is_base64_encoded,
+        }
+
+    def __read_response(self, response):
+        if not isinstance(response, dict) or "statusCode" not in response:
+            return 200, JSON_HEADERS, json.dumps(response).encode("utf-8")
+
+        headers = {
+            key: ", ".join(str(value) for value in values)
+            for key, values in (response.get("multiValueHeaders") or {}).items()
+        }
+        headers.update(
+            {key: str(value) for key, value in (response.get("headers") or {}).items()}
+        )
+
+        body = response.get("body") or ""
+        if response.get("isBase64Encoded"):
+            body = base64.b64decode(body)
+        elif not isinstance(body, str):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        return int(response["statusCode"]), headers, body
+
+    def __request_handler(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_method(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, response_body = server.handle(
+                    self.command, self.path, self.headers.items(), body
+                )
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    if key.lower() != "content-length":
+                        self.send_header(key, value)
+                self.send_header("Content-Length", str(len(response_body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(response_body)
+
+            def log_message(self, format, *args):
+                # Requests are reported by the server together with their latency
+                pass
+
+        for method in HTTP_METHODS:
+            setattr(RequestHandler, f"do_{method}", RequestHandler.handle_method)
+
+        return RequestHandler
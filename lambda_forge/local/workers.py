@@ -0,0 +1,193 @@
+import importlib.util
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+
+
+class WorkerError(Exception):
+    pass
+
+
+class LocalContext:
+    def __init__(self, function_name, timeout, request_id) -> None:
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = (
+            f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        )
+        self.memory_limit_in_mb = None
+        self.aws_request_id = request_id
+        self.log_group_name = f"/aws/lambda/{function_name}"
+        self.log_stream_name = "local"
+        self.identity = None
+        self.client_context = None
+        self.deadline = time.time() * 1000 + timeout * 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(int(self.deadline - time.time() * 1000), 0)
+
+
+def serve(connection, function_name, function_path, root):
+    # Runs inside the worker process, the handler stays loaded between invocations
+    os.chdir(root)
+    sys.path.insert(0, root)
+
+    start_time = time.perf_counter()
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "lambda_handler", os.path.join(function_path, "main.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+
+    init_duration = (time.perf_counter() - start_time) * 1000
+    connection.send({"init_duration": init_duration, "error": error})
+    if error:
+        return
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+
+        if message is None:
+            return
+
+        context = LocalContext(function_name, message["timeout"], message["id"])
+        start_time = time.perf_counter()
+        try:
+            response = module.lambda_handler(message["event"], context)
+            error = None
+        except Exception:
+            response = None
+            error = traceback.format_exc()
+
+        connection.send(
+            {
+                "response": response,
+                "error": error,
+                "duration": (time.perf_counter() - start_time) * 1000,
+            }
+        )
+
+
+class Worker:
+    def __init__(self, mp_context, function) -> None:
+        self.connection, child_connection = mp_context.Pipe()
+        self.process = mp_context.Process(
+            target=serve,
+            args=(child_connection, function["name"], function["path"], os.getcwd()),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+        ready = self.connection.recv()
+        self.init_duration = ready["init_duration"]
+        self.cold = True
+        if ready["error"]:
+            self.stop()
+            raise WorkerError(ready["error"])
+
+    def invoke(self, request_id, event, timeout):
+        self.connection.send({"id": request_id, "event": event, "timeout": timeout})
+        if not self.connection.poll(timeout):
+            self.stop()
+            raise WorkerError(f"Task timed out after {timeout} seconds")
+
+        result = self.connection.recv()
+        result["cold"] = self.cold
+        result["init_duration"] = self.init_duration if self.cold else None
+        self.cold = False
+        return result
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class WorkerPool:
+    # Handlers are loaded in separate interpreters, so spawned workers never
+    # inherit the server threads
+    mp_context = multiprocessing.get_context("spawn")
+
+    def __init__(self, function, size) -> None:
+        self.function = function
+        self.size = size
+        self.timeout = function.get("timeout", 60)
+        self.idle = queue.LifoQueue()
+        self.started = 0
+        self.lock = threading.Lock()
+        self.latencies = {"cold": [], "warm": []}
+
+    def invoke(self, request_id, event):
+        start_time = time.perf_counter()
+        worker = self.__acquire()
+        try:
+            result = worker.invoke(request_id, event, self.timeout)
+        except Exception:
+            self.__discard(worker)
+            raise
+
+        self.idle.put(worker)
+        result["latency"] = (time.perf_counter() - start_time) * 1000
+        with self.lock:
+            self.latencies["cold" if result["cold"] else "warm"].append(
+                result["latency"]
+            )
+        return result
+
+    def stop(self):
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.stop()
+
+    def __acquire(self):
+        # The most recently used worker is reused first to keep it warm
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self.lock:
+                spawn = self.started < self.size
+                if spawn:
+                    self.started += 1
+
+            if spawn:
+                break
+
+            # Wait for a busy worker, a discarded one frees a slot to spawn
+            try:
+                return self.idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        try:
+            return Worker(self.mp_context, self.function)
+        except Exception:
+            with self.lock:
+                self.started -= 1
+            raise
+
+    def __discard(self, worker):
+        worker.stop()
+        with self.lock:
+            self.started -= 1
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from collections import deque
+
+DEFAULT_CAPACITY = 5000
+# Entries kept on disk once spilled, the oldest half is dropped past this
+DEFAULT_SPILL_CAPACITY = 50_000
+
+
+class RingBuffer:
+    def __init__(
+        self,
+        capacity=DEFAULT_CAPACITY,
+        spill_path=None,
+        serialize=None,
+        deserialize=None,
+        spill_capacity=DEFAULT_SPILL_CAPACITY,
+    ):
+        self.entries = deque(maxlen=capacity)
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.serialize = serialize or (lambda entry: json.dumps(entry, default=str))
+        self.deserialize = deserialize or json.loads
+        self.spill_capacity = spill_capacity
+        # Byte offset of every spilled entry, offsets[i] holds entry spill_start + i
+        self.offsets = []
+        self.spill_start = 0
+        self.total = 0
+        self.lock = threading.Lock()
+
+        if self.spill_path:
+            # Every session starts with an empty spill file
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            open(self.spill_path, "w").close()
+
+    @property
+    def start(self):
+        # Absolute index of the oldest entry still kept in memory
+        return self.total - len(self.entries)
+
+    @property
+    def first(self):
+        # Absolute index of the oldest entry that can still be read, spilled or not
+        return self.spill_start if self.offsets else self.start
+
+    def append(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        entries = list(entries)
+        with self.lock:
+            overflow = len(self.entries) + len(entries) - self.capacity
+            if overflow > 0 and self.spill_path:
+                # Only the evicted entries are touched, never a copy of the deque
+                spill_start = self.start
+                evicted = [
+                    self.entries.popleft()
+                    for _ in range(min(overflow, len(self.entries)))
+                ]
+                evicted += entries[: max(overflow - len(evicted), 0)]
+                self.__spill(evicted, spill_start)
+
+            self.entries.extend(entries)
+            self.total += len(entries)
+
+    def get(self, index):
+        # Absolute index lookup, entries older than start are read back from disk
+        with self.lock:
+            if index >= self.start:
+                return self.entries[index - self.start]
+            if not self.offsets or index < self.spill_start:
+                raise IndexError(index)
+
+            with open(self.spill_path, "rb") as f:
+                f.seek(self.offsets[index - self.spill_start])
+                return self.deserialize(f.readline().decode("utf-8"))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total = 0
+            self.offsets = []
+            self.spill_start = 0
+            if self.spill_path:
+                open(self.spill_path, "w").close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def __spill(self, entries, spill_start):
+        if not self.offsets:
+            self.spill_start = spill_start
+
+        with open(self.spill_path, "ab") as f:
+            for entry in entries:
+                self.offsets.append(f.tell())
+                f.write(f"{self.serialize(entry)}\n".encode("utf-8"))
+
+        if len(self.offsets) > self.spill_capacity:
+            self.__compact()
+
+    def __compact(self):
+        # Rewrites the file with its newest half, so disk use stays bounded and
+        # the cost is amortized over the spills that filled the other half
+        keep = self.spill_capacity // 2
+        dropped = len(self.offsets) - keep
+        with open(self.spill_path, "rb") as f:
+            f.seek(self.offsets[dropped])
+            kept = f.read()
+
+        base = self.offsets[dropped]
+        self.offsets = [offset - base for offset in self.offsets[dropped:]]
+        self.spill_start += dropped
+        with open(self.spill_path, "wb") as f:
+            f.write(kept)
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+
+import boto3
+from botocore.exceptions import ClientError
+
+# CloudWatch may ingest events a few seconds after their timestamp, every query
+# looks back this far and duplicates are dropped by event key
+INGESTION_LAG_MS = 10_000
+DEDUPE_SIZE = 20_000
+
+# A single StartLiveTail session accepts up to 10 log groups
+LIVE_TAIL_GROUPS = 10
+
+# FilterLogEvents returns at most this many events per page
+MAX_PAGE_SIZE = 10_000
+
+
+def event_key(group, event):
+    # FilterLogEvents results are keyed on their eventId, so identical lines logged
+    # in the same millisecond stay distinct. Live Tail results carry no eventId
+    # and fall back to their content.
+    if event.get("eventId"):
+        return event["eventId"]
+    return (group, event.get("logStreamName"), event["timestamp"], event["message"])
+
+
+class LogEngine:
+    def __init__(
+        self, log_groups, region=None, account=None, client=None, start_time=None
+    ) -> None:
+        self.client = client or boto3.client("logs", region_name=region)
+        self.region = region
+        self.account = account
+        self.groups = list(log_groups)
+        start_time = start_time if start_time is not None else int(time.time() * 1000)
+        self.high_water = {group: start_time for group in self.groups}
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def supports_live_tail(self):
+        return hasattr(self.client, "start_live_tail") and bool(self.account)
+
+    # FilterLogEvents only accepts one log group, so polling costs one call per
+    # group and tick. Live Tail is the only mode with a near constant call count.
+    def poll(self, group, limit=None):
+        raw_events = []
+        unseen = 0
+        kwargs = {
+            "logGroupName": group,
+            "startTime": max(self.high_water[group] - INGESTION_LAG_MS, 0),
+        }
+        if limit is not None:
+            kwargs["limit"] = min(limit, MAX_PAGE_SIZE)
+
+        # A single query covers every stream of the group, so concurrent
+        # instances of the function are never missed
+        try:
+            while True:
+                response = self.client.filter_log_events(**kwargs)
+                page = response.get("events", [])
+                raw_events.extend(page)
+                if not response.get("nextToken"):
+                    break
+
+                # A backlog larger than the caller keeps is not paged in at
+                # once, the cursor resumes from the last event on the next poll
+                if limit is not None:
+                    unseen += self.__count_unseen(group, page)
+                    if unseen >= limit:
+                        break
+                kwargs["nextToken"] = response["nextToken"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise
+
+        # Events are only marked as seen once every page was read, a failed page
+        # leaves them to be delivered by the retry
+        events = [self.__accept(group, event) for event in raw_events]
+        events = [event for event in events if event is not None]
+        if events:
+            with self.lock:
+                self.high_water[group] = max(
+                    self.high_water[group], *[event["timestamp"] for event in events]
+                )
+        return sorted(events, key=lambda event: event["timestamp"])
+
+    def live_tail(self, callback, stop_event):
+        # One session per chunk of groups, each one streamed by its own thread
+        errors = []
+        threads = []
+        for i in range(0, len(self.groups), LIVE_TAIL_GROUPS):
+            thread = threading.Thread(
+                target=self.__run_session,
+                args=(self.groups[i : i + LIVE_TAIL_GROUPS], callback, stop_event, errors),
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def __run_session(self, groups, callback, stop_event, errors):
+        try:
+            self.__live_tail_session(groups, callback, stop_event)
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+
+    def __live_tail_session(self, groups, callback, stop_event):
+        identifiers = {
+            f"arn:aws:logs:{self.region}:{self.account}:log-group:{group}": group
+            for group in groups
+        }
+
+        while not stop_event.is_set():
+            response = self.client.start_live_tail(
+                logGroupIdentifiers=list(identifiers)
+            )
+            for message in response["responseStream"]:
+                if stop_event.is_set():
+                    return
+
+                update = message.get("sessionUpdate")
+                if not update:
+                    continue
+
+                for result in update.get("sessionResults", []):
+                    identifier = result.get("logGroupIdentifier", "")
+                    group = identifiers.get(identifier, identifier.split(":")[-1])
+                    event = self.__accept(
+                        group,
+                        {
+                            "logStreamName": result.get("logStreamName"),
+                            "timestamp": result.get("timestamp"),
+                            "message": result.get("message", ""),
+                        },
+                    )
+                    if event is not None:
+                        callback(event)
+
+    def __count_unseen(self, group, events):
+        with self.lock:
+            return sum(event_key(group, event) not in self.seen for event in events)
+
+    def __accept(self, group, event):
+        key = event_key(group, event)
+        with self.lock:
+            if key in self.seen:
+                return None
+
+            self.seen[key] = True
+            if len(self.seen) > DEDUPE_SIZE:
+                self.seen.popitem(last=False)
+
+        return {
+            "id": key,
+            "group": group,
+            "stream": event.get("logStreamName"),
+            "timestamp": event["timestamp"],
+            "message": event["message"],
+        }
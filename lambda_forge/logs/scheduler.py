@@ -0,0 +1,93 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lambda_forge.aws_errors import is_throttled
+
+
+class PollScheduler:
+    def __init__(
+        self,
+        engine,
+        callback,
+        min_interval=1,
+        max_interval=60,
+        throttle_penalty=4,
+        workers=4,
+        on_error=None,
+    ) -> None:
+        self.engine = engine
+        self.callback = callback
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.throttle_penalty = throttle_penalty
+        self.on_error = on_error
+        self.delays = {group: min_interval for group in engine.groups}
+        self.heap = [(time.monotonic(), group) for group in engine.groups]
+        heapq.heapify(self.heap)
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def run(self):
+        # Each group is polled on its own cadence, a slow group only holds one worker
+        try:
+            while not self.stop_event.is_set():
+                with self.condition:
+                    while not self.stop_event.is_set():
+                        now = time.monotonic()
+                        if self.heap and self.heap[0][0] <= now:
+                            break
+                        timeout = self.heap[0][0] - now if self.heap else None
+                        self.condition.wait(timeout)
+
+                    if self.stop_event.is_set():
+                        break
+                    _, group = heapq.heappop(self.heap)
+
+                self.executor.submit(self.__poll, group)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def stop(self):
+        with self.condition:
+            self.stop_event.set()
+            self.condition.notify_all()
+
+    def __poll(self, group):
+        previous = self.delays[group]
+        # Used when the poll itself fails or a callback raises
+        delay = previous * 2
+        try:
+            try:
+                events = self.engine.poll(group)
+            except Exception as e:
+                events = []
+                if is_throttled(e):
+                    delay = previous * self.throttle_penalty
+                elif self.on_error is not None:
+                    self.on_error(group, e)
+            else:
+                # Active groups are polled fast, idle ones back off exponentially
+                delay = self.min_interval if events else previous * 2
+
+            try:
+                for event in events:
+                    self.callback(event)
+            except Exception as e:
+                if self.on_error is None:
+                    raise
+                self.on_error(group, e)
+        finally:
+            # The group stays scheduled even when a callback or on_error raises
+            delay = min(max(delay, self.min_interval), self.max_interval)
+            self.__schedule(group, delay)
+
+    def __schedule(self, group, delay):
+        with self.condition:
+            self.delays[group] = delay
+            jitter = random.uniform(0.9, 1.1) if delay > self.min_interval else 1
+            heapq.heappush(self.heap, (time.monotonic() + delay * jitter, group))
+            self.condition.notify()
@@ -1,42 +0,0 @@
-log_groups = [
-    ("/aws/lambda/Live-Telegram-AskQuestion", "Live Telegram AskQuestion"),
-    ("/aws/lambda/Live-Whatsapp-AskQuestion", "Live WhatsApp AskQuestion"),
-    ("/aws/lambda/Live-Instagram-AskQuestion", "Live Instagram AskQuestion"),
-    ("/aws/lambda/Live-Telegram-AskQuestion-2", "Live Telegram AskQuestion 2"),
-    ("/aws/lambda/Live-Whatsapp-AskQuestion-2", "Live WhatsApp AskQuestion 2"),
-]
-
-cloudwatch_logs = [
-    {
-        "timestamp": "1723345218900",
-        "message": "INIT_START Runtime Version: python:3.9.v55    Runtime Version ARN: arn:aws:lambda:us-east-2::runtime:be9e7121d3264b1e86158b38dbbb656c23dff979eb481793ee37b9e2b79fda22",
-    },
-    {
-        "timestamp": "1723345219013",
-        "message": "START RequestId: eb5ea470-b2c6-4739-9c47-cc770c36fea6 Version: $LATEST",
-    },
-    {
-        "timestamp": "1723345220026",
-        "message": "END RequestId: eb5ea470-b2c6-4739-9c47-cc770c36fea6",
-    },
-    {
-        "timestamp": "1723345220026",
-        "message": "REPORT RequestId: eb5ea470-b2c6-4739-9c47-cc770c36fea6    Duration: 1013.31 ms    Billed Duration: 1014 ms    Memory Size: 128 MB    Max Memory Used: 46 MB    Init Duration: 111.94 ms",
-    },
-    {
-        "timestamp": "1723345237339",
-        "message": "START RequestId: a719c94f-0532-4394-b47d-28595a7b3105 Version: $LATEST",
-    },
-    {
-        "timestamp": "1723345238004",
-        "message": "END RequestId: a719c94f-0532-4394-b47d-28595a7b3105",
-    },
-    {
-        "timestamp": "1723345238004",
-        "message": "REPORT RequestId: a719c94f-0532-4394-b47d-28595a7b3105    Duration: 665.52 ms    Billed Duration: 666 ms    Memory Size: 128 MB    Max Memory Used: 47 MB",
-    },
-    {
-        "timestamp": "1723345616747",
-        "message": "[ERROR]    2024-08-11T03:06:56.747Z    a719c94f-0532-4394-b47d-28595a7b3105    Disconnect timed out",
-    },
-] * 2
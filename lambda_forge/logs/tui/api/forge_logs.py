@@ -1,7 +1,14 @@
-from collections import defaultdict
+import json
+import re
+import time
 from enum import Enum
 from typing import Dict, Iterable, List, Optional
-from ._test_data import log_groups, cloudwatch_logs
+
+from lambda_forge.context import create_context
+from lambda_forge.logs.engine import LogEngine
+
+# History loaded when the TUI starts, later ticks only fetch new events
+INITIAL_LOOKBACK_SECONDS = 30 * 60
 
 
 class LogType(Enum):
@@ -10,6 +17,10 @@ class LogType(Enum):
     END = "END"
     REPORT = "REPORT"
     INIT_START = "INIT_START"
+    WARNING = "[WARNING]"
+    INFO = "[INFO]"
+    DEBUG = "[DEBUG]"
+    LOG = "LOG"
 
 
 class LambdaGroup:
@@ -18,6 +29,15 @@ class LambdaGroup:
         self.group = group
 
 
+REPORT_FIELDS = {
+    "duration": r"\bDuration: ([\d.]+) ms",
+    "billed_duration": r"Billed Duration: ([\d.]+) ms",
+    "memory_size": r"Memory Size: (\d+) MB",
+    "max_memory_used": r"Max Memory Used: (\d+) MB",
+    "init_duration": r"Init Duration: ([\d.]+) ms",
+}
+
+
 class CloudWatchLog:
 
     def __init__(self, log_type: LogType, message: str, timestamp: int) -> None:
@@ -27,37 +47,69 @@ class CloudWatchLog:
 
     @classmethod
     def parse(cls, timestamp: int, message: str):
-        log_type, message = message.split(" ", 1)
-        log_type = LogType(log_type)
+        parts = re.split(r"\s+", message.strip(), 1)
+        try:
+            log_type = LogType(parts[0])
+            message = parts[1] if len(parts) > 1 else ""
+        except ValueError:
+            # Plain prints from the handler carry no prefix
+            log_type = LogType.LOG
+            message = message.strip()
 
         return cls(log_type, message, int(timestamp))
 
+    def report(self) -> Optional[Dict]:
+        if self.log_type != LogType.REPORT:
+            return None
+
+        metrics = {}
+        for field, pattern in REPORT_FIELDS.items():
+            match = re.search(pattern, self.message)
+            metrics[field] = float(match.group(1)) if match else None
+        return metrics
+
 
 class ForgeLogsAPI:
     def __init__(self, params: Optional[Dict]) -> None:
-        self.params = params
-        self.d = defaultdict(int)
+        self.params = params or {}
+        self.lambdas = self.__discover_lambdas()
+        cdk = json.load(open("cdk.json", "r"))
+        self.engine = LogEngine(
+            [lambda_group.name for lambda_group in self.lambdas],
+            region=cdk["context"].get("region"),
+            account=cdk["context"].get("account"),
+            start_time=int((time.time() - INITIAL_LOOKBACK_SECONDS) * 1000),
+        )
 
     def get_lambdas(self) -> List[LambdaGroup]:
-        return [LambdaGroup(group, name) for group, name in log_groups]
-
-    # NOTE: Implement this function (@gui)
-    def _get_logs(self, lambda_group: str) -> List[Dict]:
-        self.d[lambda_group] += 1
-
-        def _get_index(name):
-            return [i for i, _ in log_groups].index(name)
-
-        if _get_index(lambda_group) % 2 == 0:
-            return list(reversed(cloudwatch_logs))[0 : self.d[lambda_group]]
-        else:
-            return cloudwatch_logs[0 : self.d[lambda_group]]
-
-    def get_logs(self, lambda_group: str) -> Iterable[CloudWatchLog]:
-        logs = self._get_logs(lambda_group)
-
-        for log in logs:
-            yield CloudWatchLog.parse(
-                log["timestamp"],
-                log["message"],
+        return self.lambdas
+
+    def get_logs(
+        self, lambda_group: str, limit: Optional[int] = None
+    ) -> Iterable[CloudWatchLog]:
+        # The engine keeps a cursor per group, only unseen events are returned.
+        # With a limit, a long backlog is fetched over several calls.
+        for event in self.engine.poll(lambda_group, limit=limit):
+            yield CloudWatchLog.parse(event["timestamp"], event["message"])
+
+    def __discover_lambdas(self) -> List[LambdaGroup]:
+        cdk = json.load(open("cdk.json", "r"))
+        functions = json.load(open("functions.json", "r"))
+
+        include = self.params.get("include")
+        exclude = self.params.get("exclude")
+        if include:
+            functions = [f for f in functions if f["name"] in include]
+        if exclude:
+            functions = [f for f in functions if f["name"] not in exclude]
+
+        stage = self.params.get("stage") or "Dev"
+        minimal = "resources" in cdk["context"]
+        context = create_context(stage, stage.lower(), minimal)
+
+        return [
+            LambdaGroup(
+                f"/aws/lambda/{context.create_id(function['name'])}", function["name"]
             )
+            for function in functions
+        ]
@@ -24,7 +24,9 @@ class Index(Screen):
         with TabbedContent(id="cloud_watch_logs"):
             for log_group in self.logs_api.get_lambdas():
                 with TabPane(log_group.group):
-                    yield CloudWatchLogs(log_group)
+                    yield CloudWatchLogs(
+                        log_group, spill=bool(self.logs_api.params.get("spill"))
+                    )
 
     @on(TabbedContent.TabActivated)
     def _tab_activated(self, event: TabbedContent.TabActivated):
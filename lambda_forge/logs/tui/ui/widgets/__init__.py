@@ -1,2 +1,3 @@
 from .cloudwatch_log import CloudWatchLogs
 from .header import ForgeLogsHeader
+from .log_view import LogView
@@ -1,9 +1,20 @@
+import os
+from textual import work
 from textual.app import ComposeResult
-from textual.widgets import OptionList, Static, TabPane, TabbedContent
+from textual.widgets import Static, TabPane, TabbedContent
+from lambda_forge.cache_dir import LOGS_DIR, make_cache_dir
+from lambda_forge.logs.buffer import RingBuffer
 from ...api.forge_logs import ForgeLogsAPI, LambdaGroup
-from .cloudwatch_single_log import CloudWatchSingleLog
+from .cloudwatch_single_log import (
+    COLLAPSED_HEIGHT,
+    deserialize_cloudwatch_log,
+    render_cloudwatch_log,
+    serialize_cloudwatch_log,
+)
+from .log_view import LogView
 
 LOGS_UPDATE_INTERVAL = 3
+LOGS_BUFFER_SIZE = 5000
 
 
 class CloudWatchLogs(Static):
@@ -29,8 +40,7 @@ class CloudWatchLogs(Static):
         return self.app.query_one("#cloud_watch_logs", expect_type=TabbedContent)
 
     def reset_logs(self):
-        self.logs.extend(self.new_logs)
-        self.new_logs.clear()
+        self.new_logs = 0
         self.update_tab_label()
 
     def update_tab_label(self):
@@ -38,40 +48,66 @@ class CloudWatchLogs(Static):
         label = self.log_group.group
 
         if self.new_logs:
-            label += f" ({len(self.new_logs)})"
+            label += f" ({self.new_logs})"
 
         tab_pane.label = label
 
     @property
-    def log_list(self) -> OptionList:
-        return self.query_one(OptionList)
+    def log_view(self) -> LogView:
+        return self.query_one(LogView)
 
-    def __init__(self, log_group: LambdaGroup):
+    def __init__(self, log_group: LambdaGroup, spill: bool = False):
         self.log_group = log_group
-        self.logs = []
-        self.new_logs = []
+        spill_path = None
+        if spill:
+            # Logs evicted from memory stay scrollable from a per session file
+            make_cache_dir(LOGS_DIR)
+            spill_path = os.path.join(LOGS_DIR, f"{log_group.group}.log")
+        self.logs = RingBuffer(
+            LOGS_BUFFER_SIZE,
+            spill_path=spill_path,
+            serialize=serialize_cloudwatch_log,
+            deserialize=deserialize_cloudwatch_log,
+        )
+        self.new_logs = 0
+        self.fetching = False
         super().__init__(id=log_group.name.replace("/", "-"))
 
     def on_mount(self):
+        self.update_logs()
         self.set_interval(LOGS_UPDATE_INTERVAL, self.update_logs)
 
     def update_logs(self):
-        all_logs = list(self.logs_api.get_logs(self.log_group.name))
-        self.new_logs = all_logs[len(self.logs) :]
-
-        if not self.new_logs:
+        # A slow CloudWatch call must never overlap the next tick
+        if self.fetching:
             return
-
-        for log in all_logs[len(self.log_list._options) :]:
-            self.log_list.add_option(CloudWatchSingleLog(log))
-
+        self.fetching = True
+        self.fetch_logs()
+
+    @work(thread=True, exit_on_error=False)
+    def fetch_logs(self):
+        try:
+            # Never fetch more than the buffer keeps, the rest follows next tick
+            logs = list(
+                self.logs_api.get_logs(self.log_group.name, limit=LOGS_BUFFER_SIZE)
+            )
+        finally:
+            self.fetching = False
+
+        if logs:
+            self.app.call_from_thread(self.append_logs, logs)
+
+    def append_logs(self, logs):
+        self.logs.extend(logs)
+        self.log_view.refresh_entries()
+        self.new_logs += len(logs)
         self.update_tab_label()
 
         if self.parent_tab.id == self.tabbed_content.active:
             self.reset_logs()
 
     def compose(self) -> ComposeResult:
-        yield OptionList()
+        yield LogView(self.logs, render_cloudwatch_log, COLLAPSED_HEIGHT)
 
     def on_show(self):
-        self.log_list.focus()
+        self.log_view.focus()
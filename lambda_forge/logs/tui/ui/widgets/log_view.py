@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+from rich.console import RenderableType
+from rich.segment import Segment
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from lambda_forge.logs.buffer import RingBuffer
+
+RENDER_CACHE_SIZE = 256
+
+
+class LogView(ScrollView, can_focus=True):
+    DEFAULT_CSS = """
+    LogView {
+        height: 1fr;
+    }
+    """
+
+    COMPONENT_CLASSES = {"log-view--highlighted"}
+    BINDINGS = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "first", "First", show=False),
+        Binding("end", "last", "Last", show=False),
+        Binding("enter", "toggle", "Expand", show=False),
+    ]
+
+    def __init__(
+        self,
+        buffer: RingBuffer,
+        render_entry: Callable[[Any, bool], RenderableType],
+        collapsed_height: int = 1,
+        id: Optional[str] = None,
+    ) -> None:
+        super().__init__(id=id)
+        self.buffer = buffer
+        self.render_entry = render_entry
+        self.collapsed_height = collapsed_height
+        self.cursor = None
+        self.expanded = None
+        self.expanded_height = collapsed_height
+        self.cache = OrderedDict()
+
+    def refresh_entries(self):
+        # Called after the buffer changes, keeps following the tail when at the bottom
+        follow = self.scroll_offset.y >= self.max_scroll_y
+        if self.cursor is not None and self.cursor < self.buffer.first:
+            self.cursor = None
+        if self.expanded is not None and self.expanded < self.buffer.first:
+            self.expanded = None
+
+        self.__update_virtual_size()
+        if follow:
+            self.scroll_end(animate=False)
+        self.refresh()
+
+    def clear(self):
+        self.buffer.clear()
+        self.cache.clear()
+        self.cursor = None
+        self.expanded = None
+        self.refresh_entries()
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        located = self.__locate(self.scroll_offset.y + y)
+        if located is None:
+            return Strip.blank(width, self.rich_style)
+
+        index, line = located
+        lines = self.__render(index, width)
+        if line >= len(lines):
+            return Strip.blank(width, self.rich_style)
+        return lines[line]
+
+    def on_resize(self, event: events.Resize):
+        self.refresh_entries()
+
+    def on_click(self, event: events.Click):
+        located = self.__locate(self.scroll_offset.y + event.y)
+        if located is None:
+            return
+
+        self.cursor = located[0]
+        self.action_toggle()
+
+    def action_cursor_up(self):
+        self.__move(-1)
+
+    def action_cursor_down(self):
+        self.__move(1)
+
+    def action_page_up(self):
+        self.__move(-max(self.size.height // self.collapsed_height, 1))
+
+    def action_page_down(self):
+        self.__move(max(self.size.height // self.collapsed_height, 1))
+
+    def action_first(self):
+        self.__move(-self.buffer.total)
+
+    def action_last(self):
+        self.__move(self.buffer.total)
+
+    def action_toggle(self):
+        if self.cursor is None:
+            return
+
+        self.expanded = None if self.expanded == self.cursor else self.cursor
+        self.__update_virtual_size()
+        self.__scroll_to_cursor()
+        self.refresh()
+
+    def __move(self, delta):
+        if not self.__count():
+            return
+
+        last = self.buffer.total - 1
+        cursor = last if self.cursor is None else self.cursor + delta
+        self.cursor = min(max(cursor, self.buffer.first), last)
+        self.__scroll_to_cursor()
+        self.refresh()
+
+    def __scroll_to_cursor(self):
+        height = (
+            self.expanded_height
+            if self.cursor == self.expanded
+            else self.collapsed_height
+        )
+        self.scroll_to_region(
+            Region(0, self.__top(self.cursor), self.size.width, height),
+            animate=False,
+        )
+
+    def __count(self):
+        # Spilled entries stay scrollable, they are read back from disk on render
+        return self.buffer.total - self.buffer.first
+
+    def __update_virtual_size(self):
+        height = self.__count() * self.collapsed_height
+        if self.expanded is not None:
+            self.expanded_height = len(self.__render(self.expanded, self.size.width))
+            height += self.expanded_height - self.collapsed_height
+        self.virtual_size = Size(self.size.width, height)
+
+    def __top(self, index):
+        top = (index - self.buffer.first) * self.collapsed_height
+        if self.expanded is not None and index > self.expanded:
+            top += self.expanded_height - self.collapsed_height
+        return top
+
+    def __locate(self, y):
+        # Collapsed entries share one height, so only the expanded entry shifts lines
+        if self.expanded is not None:
+            top = self.__top(self.expanded)
+            if top <= y < top + self.expanded_height:
+                return self.expanded, y - top
+            if y >= top + self.expanded_height:
+                y -= self.expanded_height - self.collapsed_height
+
+        position, line = divmod(y, self.collapsed_height)
+        if position >= self.__count():
+            return None
+        return self.buffer.first + position, line
+
+    def __render(self, index, width):
+        # Only entries on screen are rendered, and only once per state and width
+        expanded = index == self.expanded
+        highlighted = index == self.cursor
+        key = (index, expanded, highlighted, width)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        console = self.app.console
+        options = console.options.update_width(max(width, 1))
+        if not expanded:
+            options = options.update_height(self.collapsed_height)
+
+        entry = self.buffer.get(index)
+        lines = console.render_lines(
+            self.render_entry(entry, expanded), options, style=self.rich_style
+        )
+        if highlighted:
+            style = self.get_component_rich_style("log-view--highlighted")
+            lines = [list(Segment.apply_style(line, post_style=style)) for line in lines]
+
+        strips = [Strip(line, width) for line in lines]
+        self.cache[key] = strips
+        if len(self.cache) > RENDER_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return strips
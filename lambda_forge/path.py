@@ -1,16 +1,35 @@
+import hashlib
+import json
 import os
 import shutil
 import tempfile
+import time
+
+from lambda_forge.cache_dir import CACHE_DIR, make_cache_dir
+
+STAGING_DIR = os.path.join(CACHE_DIR, "staging")
+HASHES_FILE = "hashes.json"
+
+# Never part of a staged tree, they change without any source change
+IGNORED_DIRS = ["__pycache__"]
+IGNORED_SUFFIXES = [".pyc"]
+
+# Temporary stagings older than this were left behind by a crashed synth
+STALE_STAGING_SECONDS = 60 * 60
 
 
 class Path:
     _instance = None
     _temp_dir = None
+    _hashes = None
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(Path, cls).__new__(cls)
-            cls._temp_dir = tempfile.mkdtemp()
+            cls._temp_dir = os.path.abspath(STAGING_DIR)
+            make_cache_dir(cls._temp_dir)
+            cls._hashes = cls._load_hashes()
+            cls._remove_stale_stagings()
         return cls._instance
 
     @staticmethod
@@ -23,33 +42,146 @@ class Path:
 
     @staticmethod
     def function(src):
+        # Adjust the path to be relative to the staging directory
+        relative_path = src.split("functions/")[1] if "functions/" in src else src
+        return Path._stage(src, relative_path, "src")
+
+    @staticmethod
+    def layer(path):
+        return Path._stage(path, path, "python")
+
+    @staticmethod
+    def digest(staged_path):
+        # Passed to CDK as a custom asset hash, so synth never fingerprints the tree
+        return os.path.basename(staged_path).rsplit("-", 1)[1]
+
+    @staticmethod
+    def _stage(src, relative_path, folder):
         if Path._temp_dir is None:
             Path()
 
-        # Adjust the path to be relative to the temporary directory
-        relative_path = src.split("functions/")[1] if "functions/" in src else src
-        destination_path = os.path.join(Path._temp_dir, relative_path)
+        # Staged trees are addressed by the manifest of the source, so an
+        # unchanged function resolves to the same directory on every synth.
+        # The path hash keeps sources such as a/b and a-b apart.
+        normalized = os.path.normpath(relative_path).strip(os.sep)
+        slug = normalized.replace(os.sep, "-").lstrip(".-") or "root"
+        slug = f"{slug}-{hashlib.sha256(normalized.encode()).hexdigest()[:8]}"
+        digest = Path._manifest_digest(src, folder)
+        destination_path = os.path.join(Path._temp_dir, f"{slug}-{digest}")
+
+        if os.path.isdir(destination_path):
+            return destination_path
 
-        # Ensure the destination directory exists
-        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        staging_path = tempfile.mkdtemp(prefix=f".{slug}-", dir=Path._temp_dir)
+        shutil.copytree(
+            src,
+            os.path.join(staging_path, folder),
+            ignore=shutil.ignore_patterns(
+                *IGNORED_DIRS, *[f"*{suffix}" for suffix in IGNORED_SUFFIXES]
+            ),
+            copy_function=Path._link_or_copy,
+            dirs_exist_ok=True,
+        )
 
-        # Copy the source directory to the destination
-        shutil.copytree(src, f"{destination_path}/src", dirs_exist_ok=True)
+        try:
+            os.rename(staging_path, destination_path)
+        except OSError:
+            # Another stage already published the same content
+            shutil.rmtree(staging_path, ignore_errors=True)
 
+        Path._prune(slug, destination_path)
         return destination_path
 
     @staticmethod
-    def layer(path):
-        if Path._temp_dir is None:
-            Path()
+    def _manifest_digest(src, folder):
+        # Files are hashed by content, a hash is only recomputed when the size or
+        # mtime of the file changed since the last synth
+        manifest = hashlib.sha256(folder.encode())
+        changed = False
+        for root, dirs, files in os.walk(src):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+            for file in sorted(files):
+                if file.endswith(tuple(IGNORED_SUFFIXES)):
+                    continue
 
-        # Adjust the path to be relative to the temporary directory
-        destination_path = os.path.join(Path._temp_dir, path)
+                file_path = os.path.join(root, file)
+                stat = os.stat(file_path)
+                key = os.path.abspath(file_path)
+                cached = Path._hashes.get(key)
+                if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    content_hash = cached[2]
+                else:
+                    content_hash = Path._hash_file(file_path)
+                    Path._hashes[key] = [stat.st_size, stat.st_mtime_ns, content_hash]
+                    changed = True
 
-        # Ensure the destination directory exists
-        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                relative_file = os.path.relpath(file_path, src)
+                manifest.update(f"{relative_file}\0{content_hash}\n".encode())
 
-        # Copy the source directory to the destination
-        shutil.copytree(path, f"{destination_path}/python", dirs_exist_ok=True)
+        if changed:
+            Path._save_hashes()
+        return manifest.hexdigest()[:16]
 
-        return destination_path
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def _load_hashes(cls):
+        try:
+            with open(os.path.join(cls._temp_dir, HASHES_FILE), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_hashes():
+        fd, temp_path = tempfile.mkstemp(prefix=".hashes-", dir=Path._temp_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(Path._hashes, f)
+        os.replace(temp_path, os.path.join(Path._temp_dir, HASHES_FILE))
+
+    @staticmethod
+    def _link_or_copy(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+        return dst
+
+    @classmethod
+    def _remove_stale_stagings(cls):
+        # A synth that crashed mid copy leaves its hidden temporary tree behind,
+        # recent ones may still belong to a synth running next to this one
+        deadline = time.time() - STALE_STAGING_SECONDS
+        for entry in os.listdir(cls._temp_dir):
+            path = os.path.join(cls._temp_dir, entry)
+            try:
+                if not entry.startswith(".") or os.path.getmtime(path) > deadline:
+                    continue
+            except OSError:
+                continue
+
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _prune(slug, current):
+        # Drop previous stagings of the same source, they can't be reused anymore
+        for entry in os.listdir(Path._temp_dir):
+            path = os.path.join(Path._temp_dir, entry)
+            if path == current or not entry.startswith(f"{slug}-"):
+                continue
+
+            digest = entry[len(slug) + 1 :]
+            if len(digest) == 16 and all(c in "0123456789abcdef" for c in digest):
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,106 @@
+import threading
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Only these mean the resource is missing, anything else (AccessDenied, a
+# bucket in another region) is raised instead of triggering a create
+MISSING_TOPIC_ERRORS = ["NotFound", "NotFoundException"]
+MISSING_BUCKET_ERRORS = ["404", "NoSuchBucket", "NotFound"]
+
+
+class ResourceResolver:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance.resolved = {}
+                instance.clients = {}
+                instance.key_locks = {}
+                instance.lock = threading.RLock()
+                # The default session is shared with other threads, clients are
+                # only ever built from this one and under the lock
+                instance.session = boto3.session.Session()
+                cls._instance = instance
+        return cls._instance
+
+    def client(self, service, region):
+        with self.lock:
+            key = (service, region)
+            if key not in self.clients:
+                self.clients[key] = self.session.client(service, region_name=region)
+            return self.clients[key]
+
+    def topic_arn(self, topic_name, region, account, create=True):
+        key = ("sns", region, topic_name)
+        with self.__key_lock(key):
+            if key in self.resolved:
+                return self.resolved[key]
+
+            # The ARN is fully determined by region, account and name
+            sns = self.client("sns", region)
+            topic_arn = f"arn:aws:sns:{region}:{account}:{topic_name}"
+            if not self.__topic_exists(sns, topic_arn):
+                topic_arn = None
+
+            if topic_arn is None and create:
+                topic_arn = sns.create_topic(Name=topic_name)["TopicArn"]
+
+            if topic_arn is not None:
+                self.resolved[key] = topic_arn
+            return topic_arn
+
+    def bucket(self, bucket_name, region, create=True):
+        key = ("s3", region, bucket_name)
+        with self.__key_lock(key):
+            if key in self.resolved:
+                return self.resolved[key]
+
+            # Names are deterministic, a HEAD is enough and no bucket list is scanned
+            s3 = self.client("s3", region)
+            name = bucket_name if self.__bucket_exists(s3, bucket_name) else None
+
+            if name is None and create:
+                self.__create_bucket(s3, bucket_name, region)
+                name = bucket_name
+
+            if name is not None:
+                self.resolved[key] = name
+            return name
+
+    def __key_lock(self, key):
+        # Callers resolving the same resource wait for each other, other
+        # resources are resolved in parallel
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def __topic_exists(self, sns, topic_arn):
+        try:
+            sns.get_topic_attributes(TopicArn=topic_arn)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in MISSING_TOPIC_ERRORS:
+                return False
+            raise
+
+    def __bucket_exists(self, s3, bucket_name):
+        try:
+            s3.head_bucket(Bucket=bucket_name)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in MISSING_BUCKET_ERRORS:
+                return False
+            raise
+
+    def __create_bucket(self, s3, bucket_name, region):
+        kwargs = {}
+        if region != "us-east-1":
+            kwargs["CreateBucketConfiguration"] = {"LocationConstraint": region}
+
+        try:
+            s3.create_bucket(Bucket=bucket_name, **kwargs)
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
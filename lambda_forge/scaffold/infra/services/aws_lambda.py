@@ -1,5 +1,5 @@
-from aws_cdk import Duration
-from aws_cdk.aws_lambda import Code, Function, Runtime
+from aws_cdk import AssetHashType, Duration, Size
+from aws_cdk.aws_lambda import Architecture, Code, Function, Runtime
 
 from lambda_forge.path import Path
 from lambda_forge.trackers import function
@@ -20,11 +20,27 @@ class Lambda:
         directory=None,
         layers=[],
         environment={},
-        memory_size=128,
+        memory_size=None,
         runtime=Runtime.PYTHON_3_9,
         timeout=1,
+        architecture=None,
+        provisioned_concurrency=None,
+        reserved_concurrency=None,
+        ephemeral_storage_size=None,
     ):
 
+        # Defaults come from cdk.json and can be overridden per stage
+        settings = self.context.lambda_settings(
+            name,
+            memory_size=memory_size,
+            architecture=architecture,
+            provisioned_concurrency=provisioned_concurrency,
+            reserved_concurrency=reserved_concurrency,
+            ephemeral_storage_size=ephemeral_storage_size,
+        )
+        ephemeral_storage_size = settings.get("ephemeral_storage_size")
+        staged_path = Path.function(path)
+
         function = Function(
             scope=self.scope,
             id=name,
@@ -33,11 +49,32 @@ class Lambda:
             runtime=runtime,
             handler=Path.handler(directory),
             environment=environment,
-            code=Code.from_asset(path=Path.function(path)),
+            code=Code.from_asset(
+                path=staged_path,
+                asset_hash=Path.digest(staged_path),
+                asset_hash_type=AssetHashType.CUSTOM,
+            ),
             layers=layers,
             timeout=Duration.minutes(timeout),
-            memory_size=memory_size,
+            memory_size=settings.get("memory_size", 128),
+            architecture=(
+                Architecture.ARM_64
+                if settings.get("architecture") == "arm64"
+                else Architecture.X86_64
+            ),
+            reserved_concurrent_executions=settings.get("reserved_concurrency"),
+            ephemeral_storage_size=(
+                Size.mebibytes(ephemeral_storage_size)
+                if ephemeral_storage_size
+                else None
+            ),
         )
 
+        if settings.get("provisioned_concurrency"):
+            function = function.add_alias(
+                "current",
+                provisioned_concurrent_executions=settings["provisioned_concurrency"],
+            )
+
         self.functions[name] = function
         return function
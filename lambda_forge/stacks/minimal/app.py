@@ -1,4 +1,5 @@
 import aws_cdk as cdk
+from lambda_forge.trackers import FunctionRegistry
 from infra.stacks.stack import Stack
 
 app = cdk.App()
@@ -6,3 +7,6 @@ app = cdk.App()
 Stack(app)
 
 app.synth()
+
+# functions.json is written once, after every stack was synthesized
+FunctionRegistry().flush()
@@ -1,8 +1,79 @@
+import atexit
 import inspect
 import json
+import os
+import time
 from functools import wraps
 
 
+class FunctionRegistry:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.functions = []
+            cls._instance.index = {}
+            cls._instance.project = None
+            cls._instance.dirty = False
+            cls._instance.started = time.time()
+            atexit.register(cls._instance.flush_after_synth)
+        return cls._instance
+
+    def get_project(self):
+        if self.project is None:
+            cdk = json.load(open("cdk.json"))
+            self.project = cdk["context"]["name"]
+        return self.project
+
+    def reset(self):
+        self.functions.clear()
+        self.index.clear()
+        self.dirty = True
+
+    def add(self, record):
+        self.functions.append(record)
+        self.index[record["name"]] = record
+        self.dirty = True
+
+    def get(self, function):
+        # Functions running with provisioned concurrency are returned as an alias
+        version = getattr(function, "version", None)
+        if version is not None and hasattr(version, "lambda_"):
+            function = version.lambda_
+
+        function_name = function._physical_name.split(f"{self.get_project()}-")[1]
+        return self.index.get(function_name)
+
+    def flush(self):
+        if not self.dirty:
+            return
+
+        with open("functions.json", "w") as file:
+            json.dump(self.functions, file, indent=4)
+
+        self.dirty = False
+
+    def flush_after_synth(self):
+        # Fallback for app.py files that do not call flush() after app.synth().
+        # Only a synth run by the cdk CLI that wrote its manifest counts, so a
+        # crashed synth or a process that merely imports the stacks writes nothing
+        outdir = os.environ.get("CDK_OUTDIR")
+        if not outdir:
+            return
+
+        try:
+            manifest_time = os.path.getmtime(os.path.join(outdir, "manifest.json"))
+        except OSError:
+            return
+
+        if manifest_time >= self.started:
+            self.flush()
+
+
+registry = FunctionRegistry()
+
+
 def invoke(service, resource, function, extra=[]):
     def decorator(func):
         @wraps(func)
@@ -21,22 +92,12 @@ def invoke(service, resource, function, extra=[]):
             function_value = args_dict.get(function)
             extra_values = {key: args_dict.get(key) for key in extra}
 
-            cdk = json.load(open("cdk.json"))
-            functions = json.load(open("functions.json"))
-
-            project = cdk["context"]["name"]
-            function_name = function_value._physical_name.split(f"{project}-")[1]
-            for fc in functions:
-                if fc["name"] == function_name:
-                    fc["invocations"].append(
-                        {"service": service, "resource": invoked_value, **extra_values}
-                    )
-                    break
-
-            cdk["context"]["functions"] = functions
-
-            with open("functions.json", "w") as file:
-                json.dump(functions, file, indent=4)
+            record = registry.get(function_value)
+            if record is not None:
+                record["invocations"].append(
+                    {"service": service, "resource": invoked_value, **extra_values}
+                )
+                registry.dirty = True
 
             # Call the original function with its arguments
             return func(*args, **kwargs)
@@ -63,20 +124,12 @@ def trigger(service, trigger, function, extra=[]):
             function_value = args_dict.get(function)
             extra_values = {key: args_dict.get(key) for key in extra}
 
-            cdk = json.load(open("cdk.json"))
-            functions = json.load(open("functions.json"))
-
-            project = cdk["context"]["name"]
-            function_name = function_value._physical_name.split(f"{project}-")[1]
-            for fc in functions:
-                if fc["name"] == function_name:
-                    fc["triggers"].append(
-                        {"service": service, "trigger": trigger_value, **extra_values}
-                    )
-                    break
-
-            with open("functions.json", "w") as file:
-                json.dump(functions, file, indent=4)
+            record = registry.get(function_value)
+            if record is not None:
+                record["triggers"].append(
+                    {"service": service, "trigger": trigger_value, **extra_values}
+                )
+                registry.dirty = True
 
             return func(*args, **kwargs)
 
@@ -88,13 +141,12 @@ def trigger(service, trigger, function, extra=[]):
 def function(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        functions = json.load(open("functions.json"))
         path = kwargs["path"]
         directory = kwargs.get("directory")
         path = f"{path}/{directory}" if directory else path
         timeout = int(kwargs.get("timeout", 1)) * 60
         name = kwargs["name"]
-        functions.append(
+        registry.add(
             {
                 "name": name,
                 "path": path,
@@ -105,9 +157,6 @@ def function(func):
             }
         )
 
-        with open("functions.json", "w") as file:
-            json.dump(functions, file, indent=4)
-
         return func(*args, **kwargs)
 
     return wrapper
@@ -116,8 +165,7 @@ def function(func):
 def reset(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        with open("functions.json", "w") as file:
-            json.dump([], file, indent=4)
+        registry.reset()
 
         return func(*args, **kwargs)
 
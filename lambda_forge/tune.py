@@ -0,0 +1,276 @@
+import ast
+import base64
+import json
+import math
+import os
+import time
+
+import boto3
+from tabulate import tabulate
+
+from lambda_forge.context import create_context
+from lambda_forge.live.cache import EVENTS_DIR
+from lambda_forge.logs.tui.api.forge_logs import CloudWatchLog
+
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1769, 3008]
+
+# USD, us-east-1 on-demand pricing
+PRICE_PER_GB_SECOND = {"x86_64": 0.0000166667, "arm64": 0.0000133334}
+PRICE_PER_REQUEST = 0.0000002
+
+STRATEGIES = ["cost", "speed", "balanced"]
+
+
+class MemoryTuner:
+    def __init__(self, function, stage, printer, endpoint_url=None) -> None:
+        self.function = function
+        self.printer = printer
+        self.endpoint_url = endpoint_url
+        self.record = self.__find_function()
+        self.project, self.function_name = self.__deployed_name(stage)
+        cdk = json.load(open("cdk.json", "r"))
+        self.lambda_client = boto3.client(
+            "lambda",
+            region_name=cdk["context"]["region"],
+            endpoint_url=endpoint_url,
+        )
+
+    def load_event(self, event_file=None):
+        if event_file is None:
+            # Events recorded by forge live for this function
+            event_file = os.path.join(
+                EVENTS_DIR, f"Live-{self.project}-{self.function}.json"
+            )
+            if not os.path.exists(event_file):
+                # An empty event would benchmark the handler's error path
+                raise ValueError(
+                    f"No event recorded for {self.function}. Invoke it once with "
+                    "forge live, or pass an event file with --event"
+                )
+
+        with open(event_file, "r") as f:
+            return json.load(f)
+
+    def run(self, memory_sizes, invocations, event):
+        configuration = self.lambda_client.get_function_configuration(
+            FunctionName=self.function_name
+        )
+        original_memory = configuration["MemorySize"]
+        architecture = (configuration.get("Architectures") or ["x86_64"])[0]
+
+        results = []
+        try:
+            for memory_size in memory_sizes:
+                self.printer.change_spinner_legend(
+                    f"Measuring {self.function_name} with {memory_size} MB"
+                )
+                self.__set_memory(memory_size)
+                samples = [self.__invoke(event) for _ in range(invocations)]
+                results.append(self.__summarize(memory_size, architecture, samples))
+        finally:
+            self.printer.change_spinner_legend("Restoring Memory Size")
+            self.__set_memory(original_memory)
+
+        mark_frontier(results)
+        return results
+
+    def write_memory_size(self, memory_size):
+        config_file = self.__find_config()
+        with open(config_file, "r") as f:
+            source = f.read()
+
+        source = set_keyword(source, self.function, "memory_size", memory_size)
+        with open(config_file, "w") as f:
+            f.write(source)
+
+        return config_file
+
+    def __find_function(self):
+        functions = json.load(open("functions.json", "r"))
+        for function in functions:
+            if function["name"] == self.function:
+                return function
+        raise ValueError(f"Function {self.function} not found in functions.json")
+
+    def __deployed_name(self, stage):
+        cdk = json.load(open("cdk.json", "r"))
+        minimal = "resources" in cdk["context"]
+        context = create_context(stage, stage.lower(), minimal)
+        return context.name, context.create_id(self.function)
+
+    def __find_config(self):
+        # The path may point to a directory inside the function folder
+        folder = os.path.normpath(self.record["path"])
+        while folder not in ["", "."]:
+            config_file = os.path.join(folder, "config.py")
+            if os.path.exists(config_file):
+                return config_file
+            folder = os.path.dirname(folder)
+        raise ValueError(f"config.py not found for {self.function}")
+
+    def __set_memory(self, memory_size):
+        self.lambda_client.update_function_configuration(
+            FunctionName=self.function_name, MemorySize=memory_size
+        )
+        self.lambda_client.get_waiter("function_updated").wait(
+            FunctionName=self.function_name,
+            WaiterConfig={"Delay": 1, "MaxAttempts": 120},
+        )
+
+    def __invoke(self, event):
+        start_time = time.perf_counter()
+        response = self.lambda_client.invoke(
+            FunctionName=self.function_name,
+            Payload=json.dumps(event).encode("utf-8"),
+            LogType="Tail",
+        )
+        elapsed = (time.perf_counter() - start_time) * 1000
+
+        report = None
+        logs = base64.b64decode(response.get("LogResult", "")).decode("utf-8")
+        for line in logs.splitlines():
+            if line.startswith("REPORT "):
+                report = CloudWatchLog.parse(time.time() * 1000, line).report()
+
+        # Local stand-ins may not emit REPORT lines, fall back to the round trip
+        if report is None:
+            report = {"duration": elapsed, "billed_duration": math.ceil(elapsed)}
+
+        report["error"] = "FunctionError" in response
+        return report
+
+    def __summarize(self, memory_size, architecture, samples):
+        billed = sorted(sample["billed_duration"] for sample in samples)
+        init = [
+            sample["init_duration"]
+            for sample in samples
+            if sample.get("init_duration")
+        ]
+        average = sum(billed) / len(billed)
+        cost = (
+            average / 1000 * memory_size / 1024 * PRICE_PER_GB_SECOND[architecture]
+            + PRICE_PER_REQUEST
+        )
+        return {
+            "memory_size": memory_size,
+            "billed_duration": average,
+            "p90": billed[min(int(len(billed) * 0.9), len(billed) - 1)],
+            "init_duration": sum(init) / len(init) if init else None,
+            "errors": sum(1 for sample in samples if sample["error"]),
+            "cost": cost,
+            "frontier": False,
+        }
+
+
+def mark_frontier(results):
+    for result in results:
+        result["frontier"] = not any(
+            other["cost"] <= result["cost"]
+            and other["billed_duration"] <= result["billed_duration"]
+            and (
+                other["cost"] < result["cost"]
+                or other["billed_duration"] < result["billed_duration"]
+            )
+            for other in results
+        )
+
+
+def choose(results, strategy):
+    candidates = [
+        result for result in results if result["frontier"] and not result["errors"]
+    ] or results
+
+    if strategy == "cost":
+        return min(candidates, key=lambda result: result["cost"])
+
+    if strategy == "speed":
+        return min(candidates, key=lambda result: result["billed_duration"])
+
+    cheapest = min(result["cost"] for result in candidates)
+    fastest = min(result["billed_duration"] for result in candidates) or 1
+    return min(
+        candidates,
+        key=lambda result: result["cost"] / cheapest
+        + result["billed_duration"] / fastest,
+    )
+
+
+def format_results(results, chosen):
+    rows = []
+    for result in results:
+        init = result["init_duration"]
+        rows.append(
+            [
+                f"{result['memory_size']} MB",
+                f"{result['billed_duration']:.1f} ms",
+                f"{result['p90']:.0f} ms",
+                f"{init:.1f} ms" if init else "-",
+                f"${result['cost'] * 1_000_000:.2f}",
+                result["errors"],
+                "*" if result["frontier"] else "",
+                "<" if result is chosen else "",
+            ]
+        )
+
+    return tabulate(
+        rows,
+        headers=[
+            "Memory",
+            "Billed (avg)",
+            "Billed (p90)",
+            "Init",
+            "Cost / 1M",
+            "Errors",
+            "Frontier",
+            "Chosen",
+        ],
+        tablefmt="rounded_grid",
+    )
+
+
+def set_keyword(source, function_name, keyword, value):
+    tree = ast.parse(source)
+    # ast offsets count UTF-8 bytes, so the source is edited as bytes
+    data = source.encode("utf-8")
+    lines = data.splitlines(keepends=True)
+
+    def offset(lineno, col):
+        return sum(len(line) for line in lines[: lineno - 1]) + col
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if getattr(node.func, "attr", None) != "create_function":
+            continue
+
+        keywords = {item.arg: item for item in node.keywords}
+        name = keywords.get("name")
+        if not (
+            name
+            and isinstance(name.value, ast.Constant)
+            and name.value.value == function_name
+        ):
+            continue
+
+        if keyword in keywords:
+            current = keywords[keyword].value
+            start = offset(current.lineno, current.col_offset)
+            end = offset(current.end_lineno, current.end_col_offset)
+            data = data[:start] + repr(value).encode("utf-8") + data[end:]
+        else:
+            # Add the keyword on its own line right after the name argument
+            end = offset(name.end_lineno, name.end_col_offset)
+            separator = ","
+            if data[end : end + 1] == b",":
+                end += 1
+                separator = ""
+            prefix = lines[name.lineno - 1][: name.col_offset].decode("utf-8")
+            indent = " " * len(prefix)
+            addition = f"{separator}\n{indent}{keyword}={value!r},"
+            data = data[:end] + addition.encode("utf-8") + data[end:]
+
+        source = data.decode("utf-8")
+        ast.parse(source)
+        return source
+
+    raise ValueError(f"create_function call for {function_name} not found")
@@ -9,7 +9,7 @@ setup(
         "attrs==22.1.0",
         "aws-cdk-lib>=2.0.0,<3.0.0",
         "constructs>=10.0.0,<11.0.0",
-        "boto3==1.26.59",
+        "boto3==1.35.0",
         "click==8.1.3",
         "pytest<7.0.0",
         "pytest-sugar==1.0.0",
@@ -24,7 +24,8 @@ setup(
         "tabulate==0.9.0",
         "diagrams==0.23.4",
         "textual==0.75.1",
-        "textual-serve==1.0.3"
+        "textual-serve==1.0.3",
+        "watchdog==4.0.1",
     ],
     include_package_data=True,
     package_data={
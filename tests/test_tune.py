@@ -0,0 +1,29 @@
+import ast
+
+from lambda_forge.tune import set_keyword
+
+CONFIG = """from infra.services import Services
+
+
+class OtherConfig:
+    def __init__(self, services: Services) -> None:
+        function = services.aws_lambda.create_function(
+            name="Other", path="x", description="ção", memory_size=128
+        )
+        services.aws_lambda.create_function(name="Ação", description="é")
+"""
+
+
+def test_set_keyword_replaces_value_after_non_ascii_text():
+    source = set_keyword(CONFIG, "Other", "memory_size", 512)
+
+    assert 'description="ção", memory_size=512\n' in source
+    ast.parse(source)
+
+
+def test_set_keyword_adds_keyword_after_non_ascii_name():
+    source = set_keyword(CONFIG, "Ação", "memory_size", 1024)
+
+    assert 'create_function(name="Ação",\n' in source
+    assert "memory_size=1024," in source
+    ast.parse(source)